@@ -48,6 +48,9 @@ from modbot.handlers.commands import (
 from modbot.handlers.messages import handle_text_message
 from vouch_db import cleanup_old_vouch_retry_attempts
 from modbot.services.metrics import stats
+from modbot.services.cleanup import start_delete_sweeper
+from modbot.dispatch import drain as drain_dispatch
+from modbot.services.vouches import flush_vouch_writes
 
 
 logger = configure_logging(logging.INFO)
@@ -130,6 +133,16 @@ async def guide_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer(msg, show_alert=True)
 
 
+async def post_stop(application: Application):
+    # Finish updates already queued per chat; the bot is shut down before post_shutdown
+    await drain_dispatch(timeout=10.0)
+
+
+async def post_shutdown(application: Application):
+    # Don't lose vouches still sitting in the write-behind queue
+    await flush_vouch_writes()
+
+
 def main():
     # Fetch environment variables dynamically
     BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -157,7 +170,7 @@ def main():
     logger.info(f"BOT_TOKEN prefix: {BOT_TOKEN[:30]}...")
     logger.info(f"WEBHOOK_URL: {WEBHOOK_URL}")
 
-    application = Application.builder().token(BOT_TOKEN).job_queue(None).build()
+    application = Application.builder().token(BOT_TOKEN).job_queue(None).post_stop(post_stop).post_shutdown(post_shutdown).build()
 
     logger.info("=== BOT APPLICATION INITIALIZED ===")
     logger.info(f"Bot token: {BOT_TOKEN[:20]}...")
@@ -210,6 +223,10 @@ def main():
     # job_queue = application.job_queue
     # if job_queue:
     #     job_queue.run_repeating(...)
+    # Ephemeral-message sweeper: uses the JobQueue when enabled, otherwise
+    # schedule_delete() falls back to a single background task.
+    if application.job_queue:
+        start_delete_sweeper(application.job_queue)
     logger.info("Scheduled jobs disabled on Python 3.13 (upgrade to Python 3.12 or lower for full features)")
 
     # Validate and log the webhook URL
@@ -11,9 +11,11 @@ ADMIN_ID = int(os.getenv("ADMIN_ID", "0"))
 # Optional AI Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 ENABLE_AI_MODERATION = os.getenv("ENABLE_AI_MODERATION", "true").lower() == "true"
+REDIS_URL = os.getenv("REDIS_URL", "")  # Optional: share AI verdicts across autoscaled instances
 
 # Moderation Settings
 AUTO_DELETE_DELAY = int(os.getenv("AUTO_DELETE_DELAY", "15"))  # Seconds - reduced for less spam
+MOD_TORCH_THREADS = int(os.getenv("MOD_TORCH_THREADS", "0"))  # Toxic-BERT intra-op threads; 0 = one per CPU core
 
 # Prohibited Content Patterns - Comprehensive Detection
 
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from modbot.services.metrics import Stat, incr
+
+logger = logging.getLogger(__name__)
+
+
+_QUEUE_MAXSIZE = 200  # pending updates per chat before the oldest is dropped
+_WORKER_IDLE_TIMEOUT = 60.0  # seconds a chat worker waits for work before exiting
+
+Handler = Callable[..., Awaitable[Any]]
+Job = Tuple[Handler, tuple, Optional[Handler]]
+
+_chat_queues: Dict[int, asyncio.Queue] = {}
+_chat_tasks: Dict[int, asyncio.Task] = {}
+_overflow_tasks: Set[asyncio.Task] = set()
+
+
+def dispatch(chat_id: int, handler: Handler, *args: Any, on_overflow: Optional[Handler] = None) -> None:
+    """
+    Run `handler(*args)` on the worker for `chat_id`.
+
+    Updates for one chat are processed in arrival order; different chats run
+    concurrently, so a slow chat can't hold up the others. If a chat's queue
+    is full, its oldest pending update is dropped and `on_overflow(*args)`
+    runs for it instead, so a raid can't get messages past moderation just
+    by outrunning the worker.
+    """
+    queue = _chat_queues.get(chat_id)
+    if queue is None:
+        queue = _chat_queues[chat_id] = asyncio.Queue(maxsize=_QUEUE_MAXSIZE)
+    if queue.full():
+        _, dropped_args, dropped_overflow = queue.get_nowait()
+        queue.task_done()
+        incr(Stat.DROPPED_UPDATES)
+        logger.warning("Chat %s queue full; dropped oldest pending update", chat_id)
+        if dropped_overflow is not None:
+            overflow = asyncio.create_task(dropped_overflow(*dropped_args))
+            _overflow_tasks.add(overflow)
+            overflow.add_done_callback(_overflow_done)
+    queue.put_nowait((handler, args, on_overflow))
+
+    task = _chat_tasks.get(chat_id)
+    if task is None or task.done():
+        _chat_tasks[chat_id] = asyncio.create_task(_chat_worker(chat_id, queue))
+
+
+async def _chat_worker(chat_id: int, queue: asyncio.Queue) -> None:
+    while True:
+        try:
+            handler, args, _ = await asyncio.wait_for(queue.get(), timeout=_WORKER_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if queue.empty():
+                break
+            continue
+        try:
+            await handler(*args)
+        except Exception as e:
+            logger.error(f"Error processing update for chat {chat_id}: {e}", exc_info=True)
+        finally:
+            queue.task_done()
+
+    # Reap the idle worker; dispatch() starts a new one on the next update
+    _chat_tasks.pop(chat_id, None)
+    _chat_queues.pop(chat_id, None)
+
+
+def _overflow_done(task: asyncio.Task) -> None:
+    _overflow_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Overflow handler failed: %s", task.exception())
+
+
+async def drain(timeout: float) -> None:
+    """
+    Let the chat workers finish what they've already accepted, for up to
+    `timeout` seconds, then cancel them and log anything left behind.
+
+    Telegram won't resend updates the webhook already acknowledged, so this
+    runs at shutdown while the bot can still act on them.
+    """
+    pending = [queue.join() for queue in _chat_queues.values()]
+    pending.extend(asyncio.shield(task) for task in _overflow_tasks)
+    if pending:
+        try:
+            await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    for chat_id, queue in list(_chat_queues.items()):
+        if queue.qsize():
+            logger.warning("Chat %s: abandoning %d queued update(s) at shutdown", chat_id, queue.qsize())
+    for task in list(_chat_tasks.values()) + list(_overflow_tasks):
+        task.cancel()
+    _chat_tasks.clear()
+    _chat_queues.clear()
+    _overflow_tasks.clear()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CommandHandler
 
 logger = logging.getLogger(__name__)
@@ -11,7 +13,16 @@ from config import ADMIN_ID, WELCOME_MESSAGE, HELP_MAIN, HELP_VOUCHING, HELP_COM
 from moderation_engine.engine import BANNED_WORDS
 from vouch_db import get_vouch_stats, search_vouches, format_vouch_for_display, delete_vouch_by_message, get_top_vouchers, count_user_vouches
 from vouch_db import get_recent_vouches, get_last_vouch_timestamp, get_last_scanned_message_id, update_sync_state, get_sync_stats
+from vouch_db import set_banned_keyword, get_banned_keyword_overrides, run_db
 from modbot.services.metrics import stats, roll_24h_if_needed
+from modbot.services.cleanup import schedule_delete
+from modbot.services.cache import cached_async
+
+_MD = ParseMode.MARKDOWN
+
+# Leaderboard prefixes for the top three positions
+_MEDALS = ("🥇 ", "🥈 ", "🥉 ")
+_VOUCH_STATS_TTL = 30  # seconds
 
 
 async def checkvouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -32,7 +43,7 @@ async def checkvouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     # Check if vouch is logged (using efficient message_id lookup)
     from vouch_db import vouch_exists_by_message_id
-    if vouch_exists_by_message_id(chat_id, message_id):
+    if await run_db(vouch_exists_by_message_id, chat_id, message_id):
         await update.message.reply_text("✅ This message is logged as a vouch.")
     else:
         await update.message.reply_text("❌ This message is NOT logged as a vouch.")
@@ -68,7 +79,7 @@ async def addvouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Check if this exact vouch (by message_id) is already logged
     from vouch_db import vouch_exists_by_message_id
-    if vouch_exists_by_message_id(chat_id, message_id):
+    if await run_db(vouch_exists_by_message_id, chat_id, message_id):
         await update.message.reply_text("✅ This message is already logged as a vouch (no duplicates).")
         return
 
@@ -79,12 +90,12 @@ async def addvouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await handle_clean_vouch(msg, from_username=msg.from_user.username)
         confirmation_message = await update.message.reply_text("✅ Vouch has been logged successfully.")
         # Auto-delete the confirmation message after 10 seconds
-        context.job_queue.run_once(lambda _: confirmation_message.delete(), 10)
+        schedule_delete(context.bot, confirmation_message.chat_id, confirmation_message.message_id, 10)
     except Exception as e:
         logger.error(f"Error logging vouch in addvouch_command: {e}", exc_info=True)
         error_message = await update.message.reply_text("❌ Failed to log vouch. Check logs for details.")
         # Auto-delete the error message after 10 seconds
-        context.job_queue.run_once(lambda _: error_message.delete(), 10)
+        schedule_delete(context.bot, error_message.chat_id, error_message.message_id, 10)
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -96,7 +107,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logger.info(f"User: {update.effective_user.id}, Chat: {update.effective_chat.id}")
     await update.message.reply_text(
         WELCOME_MESSAGE,
-        parse_mode="Markdown"
+        parse_mode=_MD
     )
     logger.info("START command response sent")
 
@@ -116,7 +127,7 @@ async def commands_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "- /mystats: View your moderation status.\n"
         "- /stats: Admin-only moderation dashboard.\n\n"
         "Our goal is to maintain a safe and welcoming community. Use these commands responsibly!",
-        parse_mode="Markdown"
+        parse_mode=_MD
     )
 
 
@@ -140,7 +151,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(
             "Welcome to our community bot! This group is dedicated to ensuring a safe and supportive environment for everyone. Use the buttons below to explore the bot's features:",
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
         logger.info("HELP command response sent")
     except Exception as e:
@@ -161,15 +172,15 @@ async def mystats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if user_status["strikes"] == 0:
         await update.message.reply_text(
             "✓ Your Status: Clean Record\n\nYou have no active violations. Keep it up!",
-            parse_mode="Markdown",
+            parse_mode=_MD,
         )
         return
 
-    recent = "\n".join([
+    recent = "\n".join(
         f"• {v.reason} (Severity: {v.severity})" for v in user_status["violations"][-5:]
-    ])
+    )
 
-    last_violation = user_status["last_violation"].strftime("%Y-%m-%d %H:%M") if user_status["last_violation"] else "N/A"
+    last_violation = datetime.fromtimestamp(user_status["last_violation"]).strftime("%Y-%m-%d %H:%M") if user_status["last_violation"] else "N/A"
     text = (
         "🛡️ Your Moderation Status\n\n"
         f"Strikes: {user_status['strikes']}/{user_status['max_strikes']}\n"
@@ -177,7 +188,7 @@ async def mystats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"Recent Violations:\n{recent}\n\n"
         f"Strikes reset after {user_status['reset_hours']} hours without violations."
     )
-    await update.message.reply_text(text, parse_mode="Markdown")
+    await update.message.reply_text(text, parse_mode=_MD)
 
 
 async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -188,12 +199,12 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     from modbot.services.metrics import stats
 
     roll_24h_if_needed()
-    top_violations_str = "\n".join([
+    top_violations_str = "\n".join(
         f"• {k}: {v}" for k, v in stats["violations"].items()
-    ])
-    severity_breakdown = "\n".join([
+    )
+    severity_breakdown = "\n".join(
         f"• {k}: {v}" for k, v in stats["severity_counts"].items()
-    ])
+    )
 
     text = (
         "📊 **Moderation Dashboard**\n\n"
@@ -209,13 +220,14 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"• Users Muted: **{stats['users_muted']}**\n\n"
         "_Protecting your community 24/7_"
     )
-    await update.message.reply_text(text, parse_mode="Markdown")
+    await update.message.reply_text(text, parse_mode=_MD)
 
 
 async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     args = context.args
     if not args:
-        s = get_vouch_stats(chat_id=update.effective_chat.id)
+        chat_id = update.effective_chat.id
+        s = await cached_async(("vouch_stats", chat_id), _VOUCH_STATS_TTL, lambda: get_vouch_stats(chat_id=chat_id))
         stats_text = (
             "📊 Vouch Statistics\n\n"
             f"Total Vouches: {s['total']}\n"
@@ -225,7 +237,7 @@ async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"Last 24h: {s['recent_24h']}\n\n"
             "Use `/search @username` to search for specific user vouches."
         )
-        await update.message.reply_text(stats_text, parse_mode="Markdown")
+        await update.message.reply_text(stats_text, parse_mode=_MD)
         return
 
     query = " ".join(args).lstrip('@')
@@ -236,23 +248,21 @@ async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Please provide a valid username to search.")
         return
 
-    vouches = search_vouches(query, chat_id=None, limit=50)  # Removed chat_id filter to search entire history
+    vouches = await run_db(search_vouches, query, chat_id=None, limit=50)  # Removed chat_id filter to search entire history
     logger.info(f"Search results for query '{query}': {len(vouches)} vouches found.")
 
     if not vouches:
         await update.message.reply_text(f"No vouches found for: {query}")
         return
 
-    results = [format_vouch_for_display(v) for v in vouches[:15]]
-    usernames = ", ".join(
-        f"@{v['from_username']}" if v.get("from_username") else v.get("from_display_name", "Unknown")
-        for v in vouches[:15]  # Limit to displayed vouches
-    )
+    shown = vouches[:15]  # Limit to displayed vouches
+    results = [format_vouch_for_display(v) for v in shown]
+    usernames = ", ".join([v["display_name"] for v in shown])
     count_line = f"Found {len(vouches)} vouch{'es' if len(vouches) != 1 else ''} for {query}."
     txt = f"**Vouches for: {query}**\n{count_line}\nFrom: {usernames}\n\n" + "\n".join(results)
     if len(vouches) > 15:
         txt += f"\n\n_Showing first 15 results, {len(vouches) - 15} more omitted_"
-    await update.message.reply_text(txt, parse_mode="Markdown")
+    await update.message.reply_text(txt, parse_mode=_MD)
 
 
 async def ask_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -291,7 +301,7 @@ async def quick_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         Keep it clean.
         """,
-        parse_mode="Markdown"
+        parse_mode=_MD
     )
 
 
@@ -302,49 +312,37 @@ async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     Usage: /leaderboard [days]
     Example: /leaderboard 7 (shows top vouchers from last week)
     """
+    args = context.args
+    msg = update.message
+
     # Parse optional days argument
     days = 7  # Default to weekly
-    if context.args:
+    if args:
         try:
-            days = int(context.args[0])
+            days = int(args[0])
             if days < 1 or days > 365:
-                await update.message.reply_text("❌ Days must be between 1 and 365")
+                await msg.reply_text("❌ Days must be between 1 and 365")
                 return
         except ValueError:
-            await update.message.reply_text("❌ Usage: /leaderboard [days]\nExample: /leaderboard 7")
+            await msg.reply_text("❌ Usage: /leaderboard [days]\nExample: /leaderboard 7")
             return
 
-    chat_id = update.effective_chat.id
-    top_vouchers = get_top_vouchers(chat_id=None, days=days, limit=10, polarity="pos")  # Removed chat_id filter
+    top_vouchers = await run_db(get_top_vouchers, chat_id=None, days=days, limit=10, polarity="pos")  # Removed chat_id filter
 
     if not top_vouchers:
-        await update.message.reply_text(f"📊 No vouches found in the last {days} day(s).")
+        await msg.reply_text(f"📊 No vouches found in the last {days} day(s).")
         return
 
     # Format leaderboard
-    leaderboard_text = f"🏆 **Top Vouchers (Last {days} Day{'s' if days != 1 else ''})**\n\n"
+    parts = [f"🏆 **Top Vouchers (Last {days} Day{'s' if days != 1 else ''})**\n\n"]
 
     for idx, voucher in enumerate(top_vouchers, 1):
-        # Display username or user ID
-        display_name = (
-            f"@{voucher['from_username']}" if voucher['from_username'] 
-            else voucher['from_display_name'] or f"User #{voucher['from_user_id']}"
-        )
-
         # Add medal emoji for top 3
-        medal = ""
-        if idx == 1:
-            medal = "🥇 "
-        elif idx == 2:
-            medal = "🥈 "
-        elif idx == 3:
-            medal = "🥉 "
-        else:
-            medal = f"{idx}. "
+        medal = _MEDALS[idx - 1] if idx <= 3 else f"{idx}. "
 
-        leaderboard_text += f"{medal}{display_name}: **{voucher['vouch_count']}** vouches\n"
+        parts.append(f"{medal}{voucher['display_name']}: **{voucher['vouch_count']}** vouches\n")
 
-    await update.message.reply_text(leaderboard_text, parse_mode="Markdown")
+    await msg.reply_text("".join(parts), parse_mode=_MD)
 
 
 async def myvouches_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -353,16 +351,19 @@ async def myvouches_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     Usage: /myvouches [days]
     Example: /myvouches 7 (shows your vouches from last week)
     """
+    args = context.args
+    msg = update.message
+
     # Parse optional days argument
     days = 7  # Default to weekly
-    if context.args:
+    if args:
         try:
-            days = int(context.args[0])
+            days = int(args[0])
             if days < 1 or days > 365:
-                await update.message.reply_text("❌ Days must be between 1 and 365")
+                await msg.reply_text("❌ Days must be between 1 and 365")
                 return
         except ValueError:
-            await update.message.reply_text("❌ Usage: /myvouches [days]\nExample: /myvouches 7")
+            await msg.reply_text("❌ Usage: /myvouches [days]\nExample: /myvouches 7")
             return
     
     user_id = update.effective_user.id
@@ -370,8 +371,10 @@ async def myvouches_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Count positive and negative vouches
-        pos_count = count_user_vouches(user_id, chat_id=chat_id, days=days, polarity="pos")
-        neg_count = count_user_vouches(user_id, chat_id=chat_id, days=days, polarity="neg")
+        pos_count, neg_count = await asyncio.gather(
+            run_db(count_user_vouches, user_id, chat_id=chat_id, days=days, polarity="pos"),
+            run_db(count_user_vouches, user_id, chat_id=chat_id, days=days, polarity="neg"),
+        )
         
         # Handle None or invalid returns from database
         if pos_count is None or neg_count is None:
@@ -381,7 +384,7 @@ async def myvouches_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         total = pos_count + neg_count
         
         if total == 0:
-            await update.message.reply_text(f"📝 You haven't given any vouches in the last {days} day(s).")
+            await msg.reply_text(f"📝 You haven't given any vouches in the last {days} day(s).")
             return
         
         text = (
@@ -390,14 +393,30 @@ async def myvouches_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"⚠️ Negative: **{neg_count}**\n"
             f"📈 Total: **{total}**"
         )
-        await update.message.reply_text(text, parse_mode="Markdown")
+        await msg.reply_text(text, parse_mode=_MD)
     except Exception as e:
         logger.error(f"Error retrieving vouch count for user {user_id}: {e}")
-        await update.message.reply_text("❌ Unable to retrieve vouch data. Please try again later.")
+        await msg.reply_text("❌ Unable to retrieve vouch data. Please try again later.")
 
 
-# In-memory dynamic configuration (for demonstration purposes)
-dynamic_banned_words = set(BANNED_WORDS)
+def _load_banned_words() -> set:
+    """Built-in keywords with the admin's persisted additions and removals applied."""
+    words = set(BANNED_WORDS)
+    for keyword, banned in get_banned_keyword_overrides().items():
+        if banned:
+            words.add(keyword)
+        else:
+            words.discard(keyword)
+    return words
+
+
+# Admin-managed keyword set, shown by /list_keywords; changes are persisted in
+# banned_keywords and replayed here at startup. Only moderation_prime imports
+# it. The running bot moderates through moderation.check_message, which
+# matches config.BANNED_KEYWORDS_FLAT instead.
+dynamic_banned_words = _load_banned_words()
+# Sorted, newline-joined listing for /list_keywords; reset whenever the set changes
+_keywords_sorted_cache: str | None = None
 
 async def add_keyword(update, context):
     if update.effective_user.id != ADMIN_ID:
@@ -408,8 +427,13 @@ async def add_keyword(update, context):
         await update.message.reply_text("Usage: /add_keyword <keyword>")
         return
 
+    global _keywords_sorted_cache
     keyword = " ".join(context.args).strip()
+    if not await run_db(set_banned_keyword, keyword, True):
+        await update.message.reply_text(f"❌ Failed to save keyword: {keyword}")
+        return
     dynamic_banned_words.add(keyword)
+    _keywords_sorted_cache = None
     await update.message.reply_text(f"✅ Added keyword: {keyword}")
 
 async def remove_keyword(update, context):
@@ -421,9 +445,15 @@ async def remove_keyword(update, context):
         await update.message.reply_text("Usage: /remove_keyword <keyword>")
         return
 
+    global _keywords_sorted_cache
     keyword = " ".join(context.args).strip()
     if keyword in dynamic_banned_words:
+        # Persisted even for built-ins, so the removal survives a restart
+        if not await run_db(set_banned_keyword, keyword, False):
+            await update.message.reply_text(f"❌ Failed to save keyword removal: {keyword}")
+            return
         dynamic_banned_words.remove(keyword)
+        _keywords_sorted_cache = None
         await update.message.reply_text(f"✅ Removed keyword: {keyword}")
     else:
         await update.message.reply_text(f"⚠️ Keyword not found: {keyword}")
@@ -437,8 +467,10 @@ async def list_keywords(update, context):
         await update.message.reply_text("No banned keywords configured.")
         return
 
-    keywords = "\n".join(sorted(dynamic_banned_words))
-    await update.message.reply_text(f"🚫 **Banned Keywords:**\n{keywords}", parse_mode="Markdown")
+    global _keywords_sorted_cache
+    if _keywords_sorted_cache is None:
+        _keywords_sorted_cache = "\n".join(sorted(dynamic_banned_words))
+    await update.message.reply_text(f"🚫 **Banned Keywords:**\n{_keywords_sorted_cache}", parse_mode=_MD)
 
 
 async def debug_vouches(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -448,13 +480,13 @@ async def debug_vouches(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     chat_id = update.effective_chat.id
-    vouches = get_recent_vouches(chat_id=chat_id, limit=15)
+    vouches = await run_db(get_recent_vouches, chat_id=chat_id, limit=15)
     if not vouches:
         await update.message.reply_text("No recent vouches found in this chat.")
         return
 
     lines = [format_vouch_for_display(v) for v in vouches]
-    await update.message.reply_text("\n\n".join(lines), parse_mode="Markdown")
+    await update.message.reply_text("\n\n".join(lines), parse_mode=_MD)
 
 
 async def deletevouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -463,24 +495,27 @@ async def deletevouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     Users can only delete their own vouches. Admins can delete any vouch.
     """
+    msg = update.message
+    chat = update.effective_chat
+    replied_message = msg.reply_to_message
+
     # Check if this is a reply to a message
-    if not update.message.reply_to_message:
-        await update.message.reply_text(
+    if not replied_message:
+        await msg.reply_text(
             "❌ **Usage:** Reply to a vouch with `/deletevouch` to delete it.\n\n"
             "You can only delete your own vouches.\n"
             "_(Admins can delete any vouch)_",
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
         return
     
-    replied_message = update.message.reply_to_message
     user_id = update.effective_user.id
-    chat_id = update.effective_chat.id
+    chat_id = chat.id
     message_id = replied_message.message_id
     is_admin = user_id == ADMIN_ID
     
     # Attempt to delete the vouch from database
-    success, message = delete_vouch_by_message(message_id, chat_id, user_id, is_admin=is_admin)
+    success, message = await run_db(delete_vouch_by_message, message_id, chat_id, user_id, is_admin=is_admin)
     
     if success:
         # Delete the actual vouch message from Telegram
@@ -492,25 +527,24 @@ async def deletevouch_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         # Delete the command message
         try:
-            await update.message.delete()
+            await msg.delete()
         except Exception:
             pass
         
         # Send temporary confirmation
         try:
-            confirmation = await update.effective_chat.send_message(
+            confirmation = await chat.send_message(
                 f"✅ {message}\n\n_(This message will disappear in 10 seconds)_",
-                parse_mode="Markdown"
+                parse_mode=_MD
             )
             # Schedule deletion
-            import asyncio
-            asyncio.create_task(_delete_after_delay(confirmation, 10))
+            schedule_delete(context.bot, confirmation.chat_id, confirmation.message_id, 10)
         except Exception:
             pass
     else:
-        await update.message.reply_text(
+        await msg.reply_text(
             f"{message}",
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
 
@@ -524,15 +558,16 @@ async def sync_vouches_command(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text("⚠️ Admin only command.")
         return
 
+    args = context.args
     chat_id = update.effective_chat.id
 
     # Check for reset flag
     reset = False
-    if context.args and context.args[0].lower() == 'reset':
+    if args and args[0].lower() == 'reset':
         reset = True
 
     # Get the last scanned message ID
-    last_scanned_id = get_last_scanned_message_id(chat_id) if not reset else None
+    last_scanned_id = await run_db(get_last_scanned_message_id, chat_id) if not reset else None
 
     processing_message = await update.message.reply_text(
         f"🔄 **Syncing vouches...**\n\n"
@@ -547,16 +582,18 @@ async def sync_vouches_command(update: Update, context: ContextTypes.DEFAULT_TYP
         vouch_count = 0
 
         for update in updates:
-            if update.message and update.message.text:
+            m = update.message
+            text = m.text if m else None
+            if text:
                 # Check if the message contains a vouch
                 from moderation_engine.engine import is_vouch
 
-                if is_vouch(update.message.text):
+                if is_vouch(text):
                     # Process the vouch
                     from modbot.services.vouches import handle_clean_vouch
 
                     try:
-                        await handle_clean_vouch(update.message)
+                        await handle_clean_vouch(m)
                         vouch_count += 1
                     except Exception as e:
                         logger.error(f"Failed to process vouch: {e}")
@@ -566,7 +603,7 @@ async def sync_vouches_command(update: Update, context: ContextTypes.DEFAULT_TYP
                 last_scanned_id = update.update_id
 
         # Update the sync state in the database
-        update_sync_state(chat_id, last_scanned_id, vouch_count)
+        await run_db(update_sync_state, chat_id, last_scanned_id, vouch_count)
 
         # Provide feedback to the user
         await processing_message.edit_text(
@@ -608,7 +645,7 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_MAIN,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
     elif callback_data == "help_vouching":
@@ -616,7 +653,7 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_VOUCHING,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
     elif callback_data == "help_commands":
@@ -624,7 +661,7 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_COMMANDS,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
     elif callback_data == "help_moderation":
@@ -632,7 +669,7 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_MODERATION,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
     elif callback_data == "help_tips":
@@ -640,7 +677,7 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_TIPS,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
     elif callback_data == "help_full":
@@ -650,20 +687,10 @@ async def help_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text(
             HELP_MESSAGE,
             reply_markup=reply_markup,
-            parse_mode="Markdown"
+            parse_mode=_MD
         )
 
 
-async def _delete_after_delay(message, delay: int):
-    """Helper to delete a message after a delay"""
-    import asyncio
-    await asyncio.sleep(delay)
-    try:
-        await message.delete()
-    except Exception:
-        pass
-
-
 async def handle_missed_vouches(context: ContextTypes.DEFAULT_TYPE):
     """Fetch and log vouches posted while the bot was disconnected."""
     try:
@@ -681,27 +708,25 @@ async def handle_missed_vouches(context: ContextTypes.DEFAULT_TYPE):
         # Pull any queued updates (messages sent while bot was offline)
         updates = await context.bot.get_updates()
         for update in updates:
-            if update.message and update.message.text:
+            m = update.message
+            text = m.text if m else None
+            if text:
                 # Check if the message contains a vouch. Use moderation-layer helper
                 from moderation_engine.engine import is_vouch
 
-                if not getattr(update.message, "text", None):
-                    continue
-                if not is_vouch(update.message.text or ""):
+                if not is_vouch(text):
                     continue
 
                 # Extract relevant data
-                from_user = update.message.from_user
-                chat_id = update.message.chat_id
-                message_id = update.message.message_id
-                text = update.message.text
+                from_user = m.from_user
+                message_id = m.message_id
 
                 # Re-run the same handling as live messages using the vouches handler
                 # This will detect multiple targets, dedupe, and store each vouch
                 from modbot.services.vouches import handle_clean_vouch
 
                 try:
-                    await handle_clean_vouch(update.message, from_username=from_user.username)
+                    await handle_clean_vouch(m, from_username=from_user.username)
                 except Exception as e:
                     logger.debug(f"Failed to process missed vouch for message {message_id}: {e}")
 
@@ -760,7 +785,7 @@ async def debug_webhook(update: Update, context: ContextTypes.DEFAULT_TYPE):
 • Max Connections: {webhook_info.max_connections}
 • Allowed Updates: {webhook_info.allowed_updates}
 """
-        await update.message.reply_text(response, parse_mode="Markdown")
+        await update.message.reply_text(response, parse_mode=_MD)
     except Exception as e:
         logger.error(f"Error in debug_webhook: {e}", exc_info=True)
         await update.message.reply_text(f"Error: {e}")
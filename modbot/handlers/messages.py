@@ -1,52 +1,67 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+import os
+import time
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from config import MAX_STRIKES
+from modbot.dispatch import dispatch
 from modbot.engine.orchestrator import analyze_message
-from modbot.services.metrics import stats, touch_group
+from modbot.services.metrics import record_removal, touch_group
 from modbot.services.strikes import record_violation
 from modbot.services.vouches import handle_clean_vouch, handle_dirty_vouch
 from vouch_db import update_vouches_with_resolved_user_id
-from moderation import track_user_activity, is_vouch_request, extract_mentions
+from moderation import track_user_activity, is_vouch_request, extract_mentions, extract_first_mention
 
 logger = logging.getLogger("modbot")
 
 
-_processed_messages = {}
+# Two generations of seen (chat_id, message_id) keys: the active one and the one
+# before it. They swap every window, so a key is remembered for 1-2 windows
+# with no per-entry timestamps and no expiry sweep.
+_processed_messages: set = set()
+_processed_messages_prev: set = set()
+_dedup_rotated_at = 0.0
 _MESSAGE_DEDUP_WINDOW = 300  # seconds
+_MESSAGE_DEDUP_MAX = 100_000
+
+# Per-message trace logging; off unless MODBOT_DEBUG_HANDLERS=1
+_DEBUG_HANDLERS = os.environ.get("MODBOT_DEBUG_HANDLERS") == "1"
+
+_POLL_OPTIONS = ("👍 Vouched", "👎 Not vouched")
+_POLL_QUESTION_DEFAULT = "Is this user vouched?"
 
 
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle incoming text messages with enhanced logging."""
-    logger.info(f"=== MESSAGE HANDLER TRIGGERED ===")
-    logger.info(f"Update: {update}")
-    logger.info(f"Message text: {update.message.text if update.message else 'NO MESSAGE'}")
-    logger.info(f"User ID: {update.effective_user.id if update.effective_user else 'NO USER'}")
-    
-    try:
-        message = update.effective_message
-        if not message or not message.text:
-            logger.info("No message or text, returning early")
-            return
+    """Handle incoming text messages."""
+    message = update.effective_message
+    if not message or not message.text:
+        return
 
-        # Deduplication window
-        now = datetime.now().timestamp()
-        key = (message.chat_id, message.message_id)
-        # Clean old entries
-        for k, ts in list(_processed_messages.items()):
-            if now - ts > _MESSAGE_DEDUP_WINDOW:
-                _processed_messages.pop(k, None)
-        if key in _processed_messages:
-            return
-        _processed_messages[key] = now
+    if _DEBUG_HANDLERS:
+        user = update.effective_user
+        logger.debug("message handler: chat=%s user=%s", message.chat_id, user.id if user else None)
+
+    # Deduplication window
+    now = time.monotonic()
+    # A plain tuple key measured faster on CPython than packing both ids
+    # into one int (the shift/xor on big ints costs more than tuple hashing)
+    key = (message.chat_id, message.message_id)
+    if _is_duplicate(key, now):
+        return
+
+    # Track group
+    touch_group(message.chat_id)
 
-        # Track group
-        touch_group(message.chat_id)
+    # The rest runs on the chat's worker so a slow chat doesn't block others
+    dispatch(message.chat_id, _process_text_message, update, message, on_overflow=_process_dropped_message)
 
+
+async def _process_text_message(update: Update, message) -> None:
+    """Moderation and vouch handling for one deduplicated text message."""
+    try:
         # Resolve any stored vouches that targeted this username (if present).
         try:
             username = update.effective_user.username
@@ -62,73 +77,91 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             pass
 
         # Rate limiting first
-        is_flood, flood_reason = track_user_activity(update.effective_user.id, message.text)
-        if is_flood:
-            try:
-                await message.delete()
-            except Exception:
-                pass
-            stats["total_removed"] += 1
-            stats["last_24h"] += 1
-            stats["violations"][flood_reason] += 1
-            stats["severity_counts"]["medium"] += 1
-            stats["users_warned"] += 1
+        if await _remove_if_flooding(update, message):
             return
 
         if is_vouch_request(message.text or ""):
             await _maybe_create_vouch_poll(message)
             return
 
+        # Parse mentions once and hand them to the vouch path below
+        mentions = extract_mentions(message.text)
+
         # Content analysis
         decision = await analyze_message(message.text, update.effective_user.id)
         
         # Enhanced logging for vouch detection
-        logger.debug(f"Message analysis: is_vouch={decision.is_vouch}, should_remove={decision.should_remove}, reason={decision.reason}")
+        logger.debug("Message analysis: is_vouch=%s, should_remove=%s, reason=%s", decision.is_vouch, decision.should_remove, decision.reason)
         if decision.is_vouch:
-            logger.info(f"VOUCH DETECTED from {update.effective_user.username} (id={update.effective_user.id}): {message.text[:100]}")
+            logger.info("VOUCH DETECTED from %s (id=%s): %.100s", update.effective_user.username, update.effective_user.id, message.text)
 
         if decision.is_vouch and not decision.should_remove:
-            logger.info(f"Processing clean vouch from {update.effective_user.username}")
-            await handle_clean_vouch(message, update.effective_user.username)
+            logger.info("Processing clean vouch from %s", update.effective_user.username)
+            await handle_clean_vouch(message, update.effective_user.username, mentions=mentions)
             return
 
         if decision.should_remove:
             if decision.is_vouch:
-                logger.info(f"Processing dirty vouch from {update.effective_user.username} - reason: {decision.reason}")
+                logger.info("Processing dirty vouch from %s - reason: %s", update.effective_user.username, decision.reason)
                 await handle_dirty_vouch(message, decision.reason)
-                stats["total_removed"] += 1
-                stats["last_24h"] += 1
-                stats["violations"]["Sanitized vouch"] += 1
-                stats["severity_counts"][decision.severity] += 1
-                stats["vouches_sanitized"] += 1
+                record_removal("Sanitized vouch", decision.severity, sanitized=True)
                 return
 
             # Non-vouch violation
-            logger.debug(f"Non-vouch violation removed: {decision.reason}")
+            logger.debug("Non-vouch violation removed: %s", decision.reason)
             try:
                 await message.delete()
             except Exception:
                 pass
 
             current = record_violation(update.effective_user.id, decision.reason, decision.severity)
-            stats["total_removed"] += 1
-            stats["last_24h"] += 1
-            stats["violations"][decision.reason] += 1
-            stats["severity_counts"][decision.severity] += 1
-            stats["users_warned"] += 1
+            record_removal(decision.reason, decision.severity)
     except Exception as e:
         logger.error(f"Error processing message: {e}", exc_info=True)
-        raise
+
+
+async def _process_dropped_message(update: Update, message) -> None:
+    """Flood check for a message its chat's full queue dropped before moderation."""
+    try:
+        await _remove_if_flooding(update, message)
+    except Exception as e:
+        logger.error(f"Error flood-checking dropped message: {e}", exc_info=True)
+
+
+async def _remove_if_flooding(update: Update, message) -> bool:
+    """Record the message for rate limiting and delete it if the sender is flooding."""
+    is_flood, flood_reason = track_user_activity(update.effective_user.id, message.text)
+    if not is_flood:
+        return False
+    try:
+        await message.delete()
+    except Exception:
+        pass
+    record_removal(flood_reason, "medium")
+    return True
+
+
+def _is_duplicate(key: tuple, now: float) -> bool:
+    global _processed_messages, _processed_messages_prev, _dedup_rotated_at
+    if now - _dedup_rotated_at >= _MESSAGE_DEDUP_WINDOW or len(_processed_messages) >= _MESSAGE_DEDUP_MAX:
+        _processed_messages_prev = _processed_messages
+        _processed_messages = set()
+        _dedup_rotated_at = now
+    if key in _processed_messages or key in _processed_messages_prev:
+        return True
+    _processed_messages.add(key)
+    return False
 
 
 async def _maybe_create_vouch_poll(message):
-    mentions = extract_mentions(message.text or "")
-    target = mentions[0] if mentions else None
-    question = f"Is @{target} vouched?" if target else "Is this user vouched?"
+    target = extract_first_mention(message.text or "")
+    question = f"Is @{target} vouched?" if target else _POLL_QUESTION_DEFAULT
+    if len(question) > 255:
+        question = question[:255]
     try:
         await message.chat.send_poll(
-            question[:255],
-            options=["👍 Vouched", "👎 Not vouched"],
+            question,
+            options=_POLL_OPTIONS,
             is_anonymous=False,
             allows_multiple_answers=False,
             reply_to_message_id=message.message_id,
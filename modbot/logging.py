@@ -1,10 +1,39 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    # The queue never leaves the process, so skip QueueHandler's eager
+    # message formatting and let the listener thread do it
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 def configure_logging(level: int = logging.INFO) -> logging.Logger:
-    logging.basicConfig(
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        level=level,
-    )
-    return logging.getLogger("modbot")
+    """
+    Log through a queue so handlers never block the event loop.
+
+    Records are put on an unbounded queue by a handler on the root logger;
+    a QueueListener thread formats and writes them to stderr.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is None:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        log_queue: queue.Queue = queue.Queue(-1)
+        root.addHandler(_InProcessQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(_listener.stop)
 
+    logger = logging.getLogger("modbot")
+    logger.propagate = True
+    return logger
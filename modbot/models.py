@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModerationDecision:
     should_remove: bool
     reason: str
@@ -12,7 +12,7 @@ class ModerationDecision:
     is_vouch: bool
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UserViolation:
     reason: str
     severity: str
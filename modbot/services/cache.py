@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+_MAX_ENTRIES = 4096
+
+# key -> (expiry, value); expiry is on the time.monotonic() clock
+_stats_cache: Dict[Hashable, Tuple[float, Any]] = {}
+
+
+def cached(key: Hashable, ttl: float, fn: Callable[[], Any]) -> Any:
+    """Return fn() memoized under `key` for `ttl` seconds."""
+    now = time.monotonic()
+    hit = _stats_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    value = fn()
+    if len(_stats_cache) >= _MAX_ENTRIES:
+        _prune(now)
+    _stats_cache[key] = (now + ttl, value)
+    return value
+
+
+async def cached_async(key: Hashable, ttl: float, fn: Callable[[], Any]) -> Any:
+    """Like cached(), but runs a blocking fn in a worker thread on a miss."""
+    now = time.monotonic()
+    hit = _stats_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    value = await asyncio.to_thread(fn)
+    if len(_stats_cache) >= _MAX_ENTRIES:
+        _prune(now)
+    _stats_cache[key] = (now + ttl, value)
+    return value
+
+
+def peek(key: Hashable) -> Any:
+    """Return the live cached value for `key`, or None on a miss."""
+    hit = _stats_cache.get(key)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def put(key: Hashable, ttl: float, value: Any) -> None:
+    """Seed the cache with a known value."""
+    now = time.monotonic()
+    if len(_stats_cache) >= _MAX_ENTRIES:
+        _prune(now)
+    _stats_cache[key] = (now + ttl, value)
+
+
+def invalidate(key: Hashable) -> None:
+    _stats_cache.pop(key, None)
+
+
+def clear() -> None:
+    _stats_cache.clear()
+
+
+def _prune(now: float) -> None:
+    for k in [k for k, (expiry, _) in _stats_cache.items() if expiry <= now]:
+        del _stats_cache[k]
+    if len(_stats_cache) >= _MAX_ENTRIES:
+        _stats_cache.clear()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+_SWEEP_INTERVAL = 1.0  # seconds, when swept by the JobQueue
+_MAX_PENDING = 10_000
+
+# Min-heap of (deadline, seq, bot, chat_id, message_id) for ephemeral bot
+# messages awaiting deletion; seq keeps ordering stable for equal deadlines
+_pending_deletes: List[Tuple[float, int, object, int, int]] = []
+_seq = itertools.count()
+_sweeper_job_registered = False
+_sweeper_task: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+
+
+def schedule_delete(bot, chat_id: int, message_id: int, delay: float) -> None:
+    """
+    Queue a bot message for deletion after `delay` seconds.
+
+    All pending deletions are drained by one sweeper (a repeating JobQueue job
+    when registered, otherwise a single background task that sleeps until the
+    earliest deadline) instead of one sleeping task per message.
+    """
+    if len(_pending_deletes) >= _MAX_PENDING:
+        # Give up on the message that is due soonest rather than grow unbounded
+        heapq.heappop(_pending_deletes)
+    entry = (time.monotonic() + delay, next(_seq), bot, chat_id, message_id)
+    heapq.heappush(_pending_deletes, entry)
+    if not _sweeper_job_registered:
+        _ensure_sweeper_task()
+        if _pending_deletes[0] is entry:
+            # New earliest deadline; wake the sweeper so it can sleep less
+            _wakeup.set()
+
+
+async def sweep_pending_deletes(context=None) -> None:
+    """Delete every queued message whose deadline has passed."""
+    now = time.monotonic()
+    due = []
+    while _pending_deletes and _pending_deletes[0][0] <= now:
+        due.append(heapq.heappop(_pending_deletes))
+    if not due:
+        return
+    results = await asyncio.gather(
+        *(bot.delete_message(chat_id=chat_id, message_id=message_id) for _, _, bot, chat_id, message_id in due),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.debug("Deferred delete failed: %s", result)
+
+
+def start_delete_sweeper(job_queue) -> None:
+    """Run the sweeper as a repeating job on the application's JobQueue."""
+    global _sweeper_job_registered
+    job_queue.run_repeating(sweep_pending_deletes, interval=_SWEEP_INTERVAL)
+    _sweeper_job_registered = True
+
+
+def _ensure_sweeper_task() -> None:
+    global _sweeper_task, _wakeup
+    if _sweeper_task is None or _sweeper_task.done():
+        _wakeup = asyncio.Event()
+        _sweeper_task = asyncio.get_running_loop().create_task(_sweep_loop(_wakeup))
+
+
+async def _sweep_loop(wakeup: asyncio.Event) -> None:
+    # Exits once the heap is empty; schedule_delete restarts it on demand
+    while _pending_deletes:
+        delay = _pending_deletes[0][0] - time.monotonic()
+        if delay > 0:
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await sweep_pending_deletes()
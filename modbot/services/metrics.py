@@ -1,21 +1,81 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict
+import time
+from array import array
+from collections import Counter
+from enum import IntEnum
+from typing import Any, Dict
 
 
-stats: Dict = {
-    "total_removed": 0,
-    "last_24h": 0,
-    "violations": defaultdict(int),
-    "severity_counts": defaultdict(int),
-    "groups": set(),
-    "last_reset": datetime.now(),
-    "users_warned": 0,
-    "users_muted": 0,
-    "vouches_sanitized": 0,
-}
+class Stat(IntEnum):
+    TOTAL_REMOVED = 0
+    LAST_24H = 1
+    USERS_WARNED = 2
+    USERS_MUTED = 3
+    VOUCHES_SANITIZED = 4
+    DROPPED_UPDATES = 5
+
+
+# Hot counters live at fixed offsets; bump them with incr() rather than by name
+_counters = array("Q", [0] * len(Stat))
+_COUNTER_KEYS = {stat.name.lower(): stat for stat in Stat}
+
+
+class _StatsView:
+    """
+    Dict-style access to the metrics for /stats and other readers.
+
+    Counter names ("total_removed", ...) map onto _counters; everything else
+    (violations, severity_counts, groups, last_reset) is stored as-is.
+    """
+
+    def __init__(self, **extra: Any) -> None:
+        self._extra: Dict[str, Any] = extra
+
+    def __getitem__(self, key: str) -> Any:
+        stat = _COUNTER_KEYS.get(key)
+        if stat is not None:
+            return _counters[stat]
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        stat = _COUNTER_KEYS.get(key)
+        if stat is not None:
+            _counters[stat] = value
+        else:
+            self._extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+stats = _StatsView(
+    violations=Counter(),
+    severity_counts=Counter(),
+    groups=set(),
+    last_reset=time.monotonic(),
+)
+
+# Bound once so record_removal skips the outer lookup for the nested counters
+_violations = stats["violations"]
+_severity_counts = stats["severity_counts"]
+
+
+def incr(stat: Stat, amount: int = 1) -> None:
+    _counters[stat] += amount
+
+
+def record_removal(reason: str, severity: str, sanitized: bool = False) -> None:
+    """Count a removed message; sanitized vouches are tallied instead of warnings."""
+    c = _counters
+    c[Stat.TOTAL_REMOVED] += 1
+    c[Stat.LAST_24H] += 1
+    _violations[reason] += 1
+    _severity_counts[severity] += 1
+    c[Stat.VOUCHES_SANITIZED if sanitized else Stat.USERS_WARNED] += 1
 
 
 def touch_group(group_id: int) -> None:
@@ -23,7 +83,7 @@ def touch_group(group_id: int) -> None:
 
 
 def roll_24h_if_needed() -> None:
-    if datetime.now() - stats["last_reset"] > timedelta(hours=24):
-        stats["last_24h"] = 0
-        stats["last_reset"] = datetime.now()
-
+    now = time.monotonic()
+    if now - stats["last_reset"] > 24 * 3600:
+        _counters[Stat.LAST_24H] = 0
+        stats["last_reset"] = now
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from telegram import Chat, Message
+
+from modbot.services.cleanup import schedule_delete
+
+logger = logging.getLogger(__name__)
+
+
+_DEBOUNCE = 0.25  # seconds to wait for more texts before flushing a chat
+_MAX_JOINED_CHARS = 4000  # stay under Telegram's 4096-char message limit
+_JOIN_SEPARATOR = "\n\n"
+
+
+class _TokenBucket:
+    """Minimal async token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _Pending:
+    __slots__ = ("text", "reply_to", "delete_after", "future")
+
+    def __init__(self, text: str, reply_to: Optional[int], delete_after: Optional[float], future: asyncio.Future) -> None:
+        self.text = text
+        self.reply_to = reply_to
+        self.delete_after = delete_after
+        self.future = future
+
+
+# Telegram limits: ~30 messages/s per bot, 20 messages/min per group
+_global_bucket = _TokenBucket(rate=30.0, capacity=30.0)
+_chat_buckets: Dict[int, _TokenBucket] = {}
+
+_pending: Dict[int, List[_Pending]] = {}
+_flush_tasks: Dict[int, asyncio.Task] = {}
+
+
+def enqueue(chat: Chat, text: str, reply_to: Optional[int] = None, delete_after: Optional[float] = None) -> asyncio.Future:
+    """
+    Queue a bot message for `chat` and return a future for the sent Message.
+
+    Ephemeral texts (with `delete_after`) queued for the same chat within the
+    debounce window are joined into one message when they share `reply_to`
+    and `delete_after`, so a burst of acks costs one API call; the sent
+    message is then handed to the cleanup sweeper. Permanent texts are always
+    sent on their own, since callers store their message_id.
+    """
+    future = asyncio.get_running_loop().create_future()
+    _pending.setdefault(chat.id, []).append(_Pending(text, reply_to, delete_after, future))
+    task = _flush_tasks.get(chat.id)
+    if task is None or task.done():
+        _flush_tasks[chat.id] = asyncio.create_task(_flush_chat(chat))
+    return future
+
+
+async def _flush_chat(chat: Chat) -> None:
+    chat_id = chat.id
+    try:
+        while _pending.get(chat_id):
+            await asyncio.sleep(_DEBOUNCE)
+            items = _pending.pop(chat_id, [])
+            for batch in _coalesce(items):
+                await _send_batch(chat, batch)
+    finally:
+        _flush_tasks.pop(chat_id, None)
+
+
+def _coalesce(items: List[_Pending]) -> List[List[_Pending]]:
+    batches: List[List[_Pending]] = []
+    size = 0
+    for item in items:
+        # Only ephemeral texts are joined; a permanent one owns its message
+        if batches and item.delete_after is not None:
+            head = batches[-1][0]
+            fits = size + len(_JOIN_SEPARATOR) + len(item.text) <= _MAX_JOINED_CHARS
+            if fits and head.reply_to == item.reply_to and head.delete_after == item.delete_after:
+                batches[-1].append(item)
+                size += len(_JOIN_SEPARATOR) + len(item.text)
+                continue
+        batches.append([item])
+        size = len(item.text)
+    return batches
+
+
+async def _send_batch(chat: Chat, batch: List[_Pending]) -> None:
+    head = batch[0]
+    bucket = _chat_buckets.get(chat.id)
+    if bucket is None:
+        bucket = _chat_buckets[chat.id] = _TokenBucket(rate=20 / 60, capacity=20.0)
+    await _global_bucket.acquire()
+    await bucket.acquire()
+
+    text = _JOIN_SEPARATOR.join(item.text for item in batch)
+    try:
+        sent: Message = await chat.send_message(
+            text,
+            reply_to_message_id=head.reply_to,
+            allow_sending_without_reply=True,
+        )
+    except Exception as e:
+        logger.debug("Queued send to chat %s failed: %s", chat.id, e)
+        for item in batch:
+            if not item.future.done():
+                item.future.set_exception(e)
+        return
+
+    if head.delete_after is not None:
+        schedule_delete(sent.get_bot(), sent.chat_id, sent.message_id, head.delete_after)
+    for item in batch:
+        if not item.future.done():
+            item.future.set_result(sent)
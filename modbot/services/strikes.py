@@ -1,40 +1,82 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, List
+import time
+from typing import Dict, Optional
 
 from modbot.models import UserViolation
+from modbot.services.cache import cached, invalidate
 from config import MAX_STRIKES, STRIKE_RESET_HOURS
 
 
-_user_strikes: Dict[int, Dict] = defaultdict(lambda: {
-    "strikes": 0,
-    "last_violation": None,
-    "violations": [],  # List[UserViolation]
-})
+_STATUS_TTL = 10  # seconds
+_STRIKE_TTL = STRIKE_RESET_HOURS * 3600  # idle seconds before a record is dropped
+_MAX_RECORDS = 100_000
+_SWEEP_INTERVAL = 60  # seconds between expiry sweeps
 
 
-def reset_if_needed(user_id: int) -> None:
-    data = _user_strikes[user_id]
-    if data["last_violation"] and data["strikes"] > 0:
-        if datetime.now() - data["last_violation"] > timedelta(hours=STRIKE_RESET_HOURS):
-            data["strikes"] = 0
-            data["violations"] = []
+def _new_record() -> Dict:
+    return {
+        "strikes": 0,
+        "last_violation": None,  # epoch seconds
+        "violations": [],  # List[UserViolation]
+    }
+
+
+# Only touched from the event loop thread, so one dict needs no locking
+_user_strikes: Dict[int, Dict] = {}
+_last_sweep = 0.0
+
+
+def _expired(data: Dict, now: float) -> bool:
+    last = data["last_violation"]
+    return last is not None and now - last > _STRIKE_TTL
+
+
+def reset_if_needed(user_id: int, data: Optional[Dict] = None) -> None:
+    """Drop the user's record once it has been idle past the reset window."""
+    if data is None:
+        data = _user_strikes.get(user_id)
+    if data is not None and _expired(data, time.time()):
+        _user_strikes.pop(user_id, None)
+
+
+def sweep_expired() -> int:
+    """Remove every idle record; returns how many were dropped."""
+    global _last_sweep
+    now = time.time()
+    _last_sweep = now
+    expired = [uid for uid, data in _user_strikes.items() if _expired(data, now)]
+    for user_id in expired:
+        del _user_strikes[user_id]
+    return len(expired)
 
 
 def record_violation(user_id: int, reason: str, severity: str) -> int:
-    reset_if_needed(user_id)
-    data = _user_strikes[user_id]
+    now = time.time()
+    if now - _last_sweep > _SWEEP_INTERVAL:
+        sweep_expired()
+    data = _user_strikes.get(user_id)
+    if data is None or _expired(data, now):
+        if len(_user_strikes) >= _MAX_RECORDS:
+            # Evict the oldest-created record to keep the table bounded
+            del _user_strikes[next(iter(_user_strikes))]
+        data = _user_strikes[user_id] = _new_record()
     data["strikes"] += 1
-    data["last_violation"] = datetime.now()
-    data["violations"].append(UserViolation(reason=reason, severity=severity, timestamp=datetime.now().timestamp()))
+    data["last_violation"] = now
+    data["violations"].append(UserViolation(reason, severity, now))
+    invalidate(("user_status", user_id))
     return data["strikes"]
 
 
 def get_user_status(user_id: int) -> Dict:
-    reset_if_needed(user_id)
-    data = _user_strikes[user_id]
+    return cached(("user_status", user_id), _STATUS_TTL, lambda: _build_user_status(user_id))
+
+
+def _build_user_status(user_id: int) -> Dict:
+    data = _user_strikes.get(user_id)
+    if data is None or _expired(data, time.time()):
+        reset_if_needed(user_id, data)
+        data = _new_record()
     return {
         "strikes": data["strikes"],
         "last_violation": data["last_violation"],
@@ -4,13 +4,18 @@ Multi-layer detection: Pattern matching + Toxicity detection + URL analysis + AI
 """
 import re
 import logging
-import httpx
 import json
+import os
 import asyncio
+import hashlib
 import importlib.util
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, List
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from config import (
     SCAM_DOMAINS,
@@ -21,21 +26,71 @@ from config import (
     WHITELIST_PHRASES,
     GROQ_API_KEY,
     ENABLE_AI_MODERATION,
+    MOD_TORCH_THREADS,
+    REDIS_URL,
 )
 
 logger = logging.getLogger(__name__)
-MENTION_REGEX = re.compile(r'@[\w\d_]+')
-_VOUCH_PREFIX_PATTERN = re.compile(
-    r"""^(
-        (?:\+|-)?rep\s+
-        |(?:pos(?:itive)?|neg(?:ative)?)\s+vouch\s+
-        |vouch\s+(?:for\s+)?
-        |vouched\s+
-    )+""",
-    re.IGNORECASE | re.VERBOSE,
+
+# Pure text helpers are memoized; vouch templates ("+vouch @x") repeat a lot
+_TEXT_CACHE_SIZE = 1024
+
+# Threads in _cpu_pool, which runs the regex layers and Toxic-BERT. Kept
+# small on purpose: the regex scans hold the GIL, and BERT batches already
+# use torch's own intra-op threads, so the executor default (cpu_count + 4,
+# sized for I/O waits) would only add contention.
+_CPU_WORKERS = 6
+
+# Optional linear-time engine for the per-message mention/prefix patterns.
+# Those patterns are written in the syntax both engines share (no flags
+# argument), so the stdlib fallback behaves the same.
+try:
+    if importlib.util.find_spec("re2") is None:
+        raise ImportError
+    _re_fast = importlib.import_module("re2")
+except ImportError:
+    _re_fast = re
+
+# Unicode word characters: mentions like "@José" are kept whole. re2's \w is
+# ASCII-only, so it gets the equivalent Unicode class spelled out.
+_MENTION_WORD = r"\w" if _re_fast is re else r"[\p{L}\p{N}_]"
+MENTION_REGEX = _re_fast.compile(rf'@{_MENTION_WORD}+')
+_WHITESPACE_RE = re.compile(r"\s+")
+_VOUCH_REQUEST_RE = re.compile(
+    r"\bany(?:one)?\s+vouches?\b"
+    r"|\bany\s+vouches?\s+on\b"
+    r"|\bvouches?\s*\?"  # "vouch?" or "vouches?"
+    r"|\bis\s+[^?]*vouched?\s*\?"  # "is @user vouched?"
+    r"|\bcan\s+(?:someone|anyone|ya|yall)\s+vouch\b"
+    r"|\bwho\s+(?:can|able\s+to)\s+vouch\b"
+    r"|\bneed(?:s)?\s+(?:a\s+)?vouch\b"
+    r"|\blooking\s+for\s+vouch"
+    r"|\bvouch(?:es)?\s+on\b"
+)
+# Mentions as written in vouches (allows '-', unlike MENTION_REGEX)
+_VOUCH_MENTION_RE = re.compile(r'@[_a-zA-Z0-9-]+')
+# Negative-vouch markers; any substring hit in the lowered text makes it a neg vouch
+_NEGATIVE_VOUCH_KEYWORDS = (
+    'neg vouch', 'negative vouch', '-vouch', '-rep', 'scammer', 'scam',
+    'do not recommend', 'dont recommend', "don't recommend",
+    'not recommend', 'no vouch', 'never vouch', 'dont trust',
+    "don't trust", 'not legit', 'fraud', 'fake', 'unreliable', 'vouch against'
+)
+_NEGATIVE_VOUCH_RE = re.compile('|'.join(map(re.escape, _NEGATIVE_VOUCH_KEYWORDS)))
+# Vouch excerpts: links become [LINK] and whitespace runs collapse, in one pass
+_EXCERPT_RE = re.compile(r'(?P<link>https?://[^\s)]*)|\s+')
+_LEADING_MENTION_RE = _re_fast.compile(rf"@{_MENTION_WORD}+\s*")
+# Most common prefixes first; applied with .match() at the start of the text
+_VOUCH_PREFIX_PATTERN = _re_fast.compile(
+    r"(?i)(?:vouch\s+(?:for\s+)?"
+    r"|vouched\s+"
+    r"|[+-]?rep\s+"
+    r"|(?:pos(?:itive)?|neg(?:ative)?)\s+vouch\s+"
+    r")+"
 )
 
 
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
 def strip_mentions(text: str) -> str:
     """Remove @handles so keyword scans don't trigger on names."""
     return MENTION_REGEX.sub(" ", text or "")
@@ -45,18 +100,154 @@ def extract_mentions(text: str) -> List[str]:
     """Return list of bare usernames mentioned (without @)."""
     if not text:
         return []
+    return list(_extract_mentions(text))
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _extract_mentions(text: str) -> Tuple[str, ...]:
+    # Cached as a tuple so callers can't mutate the shared result
     mentions = []
     for match in MENTION_REGEX.findall(text):
         username = match.lstrip("@")
         if username:
             mentions.append(username)
-    return mentions
+    return tuple(mentions)
+
+def extract_first_mention(text: str) -> Optional[str]:
+    """Return the first mentioned username (without @), stopping at the first match."""
+    if not text:
+        return None
+    match = MENTION_REGEX.search(text)
+    return match.group(0)[1:] if match else None
 
 # ============================================================================
 # TOXIC-BERT MODEL INITIALIZATION (Local AI - Zero Cost)
 # ============================================================================
 toxic_classifier = None
 
+
+class _ToxicBert:
+    """
+    Toxic-BERT called directly (tokenizer + model) instead of through the
+    HF pipeline, which adds per-call dict building and dispatch overhead.
+    """
+
+    # Telegram messages are short; BERT's default 512 costs ~16x the attention
+    MAX_LENGTH = 128
+
+    def __init__(self, model_name: str, device: str = "cpu"):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self.device = torch.device(device)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        if self.device.type == "cuda":
+            # FP16 on GPU: half the memory traffic, tensor-core matmuls
+            model = model.half()
+        self.model = model.to(self.device)
+        config = self.model.config
+        self.labels = [config.id2label[i].lower() for i in range(config.num_labels)]
+        # Same scoring as the pipeline: sigmoid for multi-label heads
+        self.multi_label = config.problem_type == "multi_label_classification" or config.num_labels == 1
+        # Fast tokenizers aren't safe to call from several _cpu_pool threads
+        self._tokenizer_lock = threading.Lock()
+
+    def top_labels(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Return the highest-scoring (label, score) for each text, in one forward pass."""
+        with self._tokenizer_lock:
+            inputs = self.tokenizer(
+                texts, padding=True, truncation=True, max_length=self.MAX_LENGTH, return_tensors="pt"
+            )
+        with self._torch.inference_mode():
+            logits = self.model(**inputs.to(self.device)).logits.float()
+        probs = logits.sigmoid() if self.multi_label else logits.softmax(-1)
+        scores, idxs = probs.max(-1)
+        return [(self.labels[i], s) for s, i in zip(scores.tolist(), idxs.tolist())]
+
+
+# Exported + INT8-quantized ONNX graph, built on first start and reused after
+_ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "toxic-bert-onnx")
+_ONNX_INT8_PATH = os.path.join(_ONNX_MODEL_DIR, "model_int8.onnx")
+
+
+class _OnnxToxicBert(_ToxicBert):
+    """
+    Toxic-BERT on ONNX Runtime. The exported graph has LayerNorm/GELU/attention
+    fused and runs int8 MatMul kernels, with no PyTorch dispatch per call.
+    """
+
+    def __init__(self, model_dir: str, int8_path: str):
+        import numpy as np
+        import onnxruntime
+        from transformers import AutoConfig, AutoTokenizer
+
+        self._np = np
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        config = AutoConfig.from_pretrained(model_dir)
+        self.labels = [config.id2label[i].lower() for i in range(config.num_labels)]
+        self.multi_label = config.problem_type == "multi_label_classification" or config.num_labels == 1
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = _inference_threads()
+        self.session = onnxruntime.InferenceSession(
+            int8_path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._tokenizer_lock = threading.Lock()
+
+    def top_labels(self, texts: List[str]) -> List[Tuple[str, float]]:
+        np = self._np
+        with self._tokenizer_lock:
+            inputs = self.tokenizer(
+                texts, padding=True, truncation=True, max_length=self.MAX_LENGTH, return_tensors="np"
+            )
+        feed = {k: v.astype(np.int64) for k, v in inputs.items() if k in self._input_names}
+        logits = self.session.run(None, feed)[0]
+        if self.multi_label:
+            probs = 1.0 / (1.0 + np.exp(-logits))
+        else:
+            exp = np.exp(logits - logits.max(-1, keepdims=True))
+            probs = exp / exp.sum(-1, keepdims=True)
+        idxs = probs.argmax(-1)
+        return [(self.labels[int(i)], float(probs[row, i])) for row, i in enumerate(idxs)]
+
+
+def _export_onnx_toxic_bert(model_name: str) -> None:
+    """Export `model_name` to ONNX with optimum and write a dynamic INT8 copy."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(_ONNX_MODEL_DIR)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(_ONNX_MODEL_DIR)
+    quantize_dynamic(
+        os.path.join(_ONNX_MODEL_DIR, "model.onnx"), _ONNX_INT8_PATH, weight_type=QuantType.QInt8
+    )
+
+
+def _load_onnx_toxic_bert(model_name: str) -> Optional[_ToxicBert]:
+    """Return the ONNX Runtime classifier, or None to fall back to PyTorch."""
+    if (
+        importlib.util.find_spec("onnxruntime") is None
+        or importlib.util.find_spec("transformers") is None
+    ):
+        return None
+    try:
+        if not os.path.exists(_ONNX_INT8_PATH):
+            if importlib.util.find_spec("optimum") is None:
+                logger.info("optimum not installed - can't export Toxic-BERT to ONNX")
+                return None
+            logger.info(f"Exporting Toxic-BERT to ONNX (INT8) at {_ONNX_MODEL_DIR}")
+            _export_onnx_toxic_bert(model_name)
+        return _OnnxToxicBert(_ONNX_MODEL_DIR, _ONNX_INT8_PATH)
+    except Exception as e:
+        logger.warning(f"ONNX Toxic-BERT unavailable: {e} (falling back to PyTorch)")
+        return None
+
+
 def initialize_toxic_classifier():
     """
     Initialize Toxic-BERT model for local toxicity/harassment detection.
@@ -71,6 +262,12 @@ def initialize_toxic_classifier():
     This layer catches harassment/toxicity BEFORE Groq AI calls, saving $$.
     """
     global toxic_classifier
+    device = _toxic_bert_device()
+    if device == "cpu":
+        toxic_classifier = _load_onnx_toxic_bert("unitary/toxic-bert")
+        if toxic_classifier is not None:
+            logger.info("Toxic-BERT loaded on ONNX Runtime (INT8)")
+            return
     if (
         importlib.util.find_spec("transformers") is None
         or importlib.util.find_spec("torch") is None
@@ -78,17 +275,73 @@ def initialize_toxic_classifier():
         logger.info("transformers/torch not installed - skipping Toxic-BERT layer")
         toxic_classifier = None
         return
+    _configure_torch()
     try:
-        from transformers import pipeline
-        toxic_classifier = pipeline(
-            "text-classification",
-            model="unitary/toxic-bert",
-            device=-1  # -1 = CPU, 0 = GPU if available
-        )
-        logger.info("Toxic-BERT model loaded successfully (local toxicity detection ready)")
+        toxic_classifier = _ToxicBert("unitary/toxic-bert", device=device)
+        logger.info(f"Toxic-BERT model loaded successfully on {device} (local toxicity detection ready)")
     except Exception as e:
         logger.warning(f"Failed to load Toxic-BERT model: {e} (toxicity layer will be skipped)")
         toxic_classifier = None
+        return
+
+    # INT8 dynamic quantization only has CPU kernels
+    if device == "cpu":
+        _quantize_toxic_classifier()
+
+
+def _inference_threads() -> int:
+    # The batcher keeps one forward pass in flight, so by default it can use
+    # every core; MOD_TORCH_THREADS caps it on shared hosts
+    return MOD_TORCH_THREADS or os.cpu_count() or 1
+
+
+def _configure_torch():
+    """Process-wide torch settings for inference-only use, applied before loading."""
+    try:
+        import torch
+
+        torch.set_grad_enabled(False)
+        torch.set_num_threads(_inference_threads())
+        # Inter-op parallelism only helps graphs with independent branches;
+        # BERT is a chain, and extra pools would compete with the intra-op one
+        torch.set_num_interop_threads(1)
+        torch.backends.mkldnn.enabled = True
+    except Exception as e:
+        logger.warning(f"Could not apply torch thread settings: {e}")
+
+
+def _toxic_bert_device() -> str:
+    """First CUDA device when torch can see one, else CPU."""
+    if importlib.util.find_spec("torch") is None:
+        return "cpu"
+    try:
+        import torch
+
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def _quantize_toxic_classifier():
+    """
+    Swap Toxic-BERT's Linear layers for dynamic INT8 ones (~2-4x faster on
+    CPU, ~4x smaller weights). Keeps the FP32 model if quantization fails.
+    """
+    try:
+        import torch
+
+        engines = torch.backends.quantized.supported_engines
+        for engine in ("onednn", "x86", "fbgemm"):
+            if engine in engines:
+                torch.backends.quantized.engine = engine
+                break
+
+        toxic_classifier.model = torch.quantization.quantize_dynamic(
+            toxic_classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info(f"Toxic-BERT quantized to INT8 ({torch.backends.quantized.engine})")
+    except Exception as e:
+        logger.warning(f"Toxic-BERT INT8 quantization failed: {e} (using FP32 model)")
 
 # Load model at startup
 try:
@@ -135,16 +388,108 @@ except ImportError:
     automaton = None
 
 
-def check_whitelist(text: str) -> bool:
+# One alternation so the whitelist is a single C-level scan per message.
+# Matched case-sensitively against lowered text: without IGNORECASE, sre can
+# use its first-character prefilter and skip most positions (~9x faster).
+_WHITELIST_RE = re.compile("|".join(re.escape(p.lower()) for p in WHITELIST_PHRASES))
+
+
+# Phrases that change how a keyword hit is judged, by category. With
+# ahocorasick installed they are all found in one scan per message.
+_CONTEXT_PHRASES = {
+    "whitelist": tuple(p.lower() for p in WHITELIST_PHRASES),
+    "critical": ('cp link', 'child porn', 'underage nudes', 'preteen', 'kiddie porn'),
+    # Drug keywords are only allowed in explicitly educational/safe context
+    "safe": (
+        'drug test', 'drug prevention', 'drug awareness', 'drug education',
+        'drug addiction', 'drug rehabilitation', 'substance abuse',
+        'say no to drugs', 'drugs are bad', 'anti-drug',
+        'cocaine is bad', 'heroin kills', 'meth dangers',
+        'addiction recovery', 'rehab', 'recovery', 'treatment', 'counseling',
+    ),
+    # Suicide keywords are allowed in gaming/movie/fictional context
+    "gaming": (
+        'video game', 'game', 'fortnite', 'minecraft', 'roblox', 'gta', 'call of duty',
+        'movie', 'film', 'book', 'story', 'fiction', 'character',
+        'comedy', 'joke', 'satire', 'cartoon', 'anime', 'manga', 'novel',
+        'play', 'theater', 'tv show', 'series', 'npc', 'cinematic', 'script',
+    ),
+    "educational": (
+        'awareness', 'prevention', 'safety', 'education', 'campaign',
+        'documentary', 'movie', 'film', 'book', 'story', 'fiction',
+        'comedy', 'joke', 'satire', 'news', 'article', 'discussion',
+        'debate', 'analysis', 'study', 'research', 'training',
+        'course', 'class', 'lesson', 'tutorial', 'guide',
+    ),
+    "negation": (
+        'against', 'anti', 'stop', 'prevent', 'avoid', 'bad', 'wrong',
+        'illegal', 'dangerous', 'harmful', 'addiction', 'recovery',
+        'rehab', 'treatment', 'counseling', 'help', 'support',
+    ),
+}
+
+_context_automaton = None
+if automaton is not None:
+    # Some phrases sit in several lists ("movie", "recovery")
+    _phrase_categories: Dict[str, Tuple[str, ...]] = {}
+    for _category, _phrases in _CONTEXT_PHRASES.items():
+        for _phrase in _phrases:
+            _phrase_categories[_phrase] = _phrase_categories.get(_phrase, ()) + (_category,)
+    _context_automaton = ahocorasick.Automaton()
+    for _phrase, _categories in _phrase_categories.items():
+        _context_automaton.add_word(_phrase, _categories)
+    _context_automaton.make_automaton()
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _context_categories(text_lower: str) -> frozenset:
+    """Every _CONTEXT_PHRASES category present in text_lower, in one automaton scan."""
+    return frozenset(c for _, categories in _context_automaton.iter(text_lower) for c in categories)
+
+
+def _has_context(text_lower: str, category: str) -> bool:
+    if _context_automaton is not None:
+        return category in _context_categories(text_lower)
+    if category == "whitelist":
+        return _WHITELIST_RE.search(text_lower) is not None
+    return any(phrase in text_lower for phrase in _CONTEXT_PHRASES[category])
+
+
+def check_whitelist(text: str, ctx: Optional["MessageCtx"] = None) -> bool:
     """Check if text contains whitelisted educational content"""
-    text_lower = text.lower()
-    return any(phrase in text_lower for phrase in WHITELIST_PHRASES)
+    return _has_context(ctx.lower if ctx is not None else text.lower(), "whitelist")
+
 
+def _lru_get(cache: OrderedDict, key):
+    """Look up key in an OrderedDict used as an LRU, marking it recently used."""
+    hit = cache.get(key)
+    if hit is not None:
+        cache.move_to_end(key)
+    return hit
 
-def check_toxicity(text: str) -> Tuple[bool, str]:
+
+def _lru_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    if len(cache) > _TEXT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+# Toxic-BERT micro-batching: messages checked within the window share one
+# forward pass, which costs far less per text than running them one by one
+_TOXICITY_BATCH_WINDOW = 0.008  # seconds
+_TOXICITY_BATCH_MAX = 16
+
+# text -> (label, score), least recently used first; repeats skip the model
+_toxicity_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_toxicity_pending: Dict[str, List[asyncio.Future]] = {}
+_toxicity_flush_task: Optional[asyncio.Task] = None
+
+
+async def check_toxicity(text: str) -> Tuple[bool, str]:
     """
     Local toxicity/harassment detection using Toxic-BERT model.
-    Runs instantly without API calls - 50-100ms on CPU.
+    Runs without API calls; concurrent checks are batched into one forward
+    pass on the CPU pool, off the event loop.
     
     Args:
         text: Message text to check
@@ -167,20 +512,19 @@ def check_toxicity(text: str) -> Tuple[bool, str]:
         return False, ""
     
     try:
-        # Truncate to 512 tokens max (BERT model limit)
+        # Cheap bound before tokenizing; the tokenizer truncates to 128 tokens
         text_truncated = text[:512] if len(text) > 512 else text
         
         # Get prediction
-        result = toxic_classifier(text_truncated)
+        hit = _lru_get(_toxicity_cache, text_truncated)
+        if hit is None:
+            label, score = await _queue_toxicity(text_truncated)
+        else:
+            label, score = hit
         
-        if result and len(result) > 0:
-            prediction = result[0]
-            label = prediction.get("label", "").lower()
-            score = prediction.get("score", 0.0)
-            
-            # Flag as toxic if model confidence is 80%+
-            if label == "toxic" and score >= 0.80:
-                return True, f"Toxicity detected (confidence: {score:.0%})"
+        # Flag as toxic if model confidence is 80%+
+        if label == "toxic" and score >= 0.80:
+            return True, f"Toxicity detected (confidence: {score:.0%})"
         
         return False, ""
         
@@ -189,27 +533,86 @@ def check_toxicity(text: str) -> Tuple[bool, str]:
         return False, ""
 
 
+def _queue_toxicity(text: str) -> asyncio.Future:
+    global _toxicity_flush_task
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _toxicity_pending.setdefault(text, []).append(future)
+    if _toxicity_flush_task is None or _toxicity_flush_task.done():
+        _toxicity_flush_task = loop.create_task(_flush_toxicity())
+    return future
+
+
+async def _flush_toxicity() -> None:
+    # Exits once nothing is pending; _queue_toxicity restarts it on demand
+    while _toxicity_pending:
+        if len(_toxicity_pending) < _TOXICITY_BATCH_MAX:
+            await asyncio.sleep(_TOXICITY_BATCH_WINDOW)
+        texts = list(_toxicity_pending)[:_TOXICITY_BATCH_MAX]
+        waiters = [_toxicity_pending.pop(text) for text in texts]
+        try:
+            results = await _run_cpu(toxic_classifier.top_labels, texts)
+        except Exception as e:
+            for futures in waiters:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            continue
+        for text, futures, result in zip(texts, waiters, results):
+            _lru_put(_toxicity_cache, text, result)
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+
+
 def is_vouch_request(text: str) -> bool:
     """Detect when someone is asking for vouches rather than giving one."""
     if not text or "vouch" not in text:
         return False
 
-    normalized = re.sub(r"\s+", " ", text.strip().lower())
-    request_patterns = [
-        r"\bany(?:one)?\s+vouches?\b",
-        r"\bany\s+vouches?\s+on\b",
-        r"\bvouches?\s*\?",  # "vouch?" or "vouches?"
-        r"\bis\s+[^?]*vouched?\s*\?",  # "is @user vouched?"
-        r"\bcan\s+(?:someone|anyone|ya|yall)\s+vouch\b",
-        r"\bwho\s+(?:can|able\s+to)\s+vouch\b",
-        r"\bneed(?:s)?\s+(?:a\s+)?vouch\b",
-        r"\blooking\s+for\s+vouch",
-        r"\bvouch(?:es)?\s+on\b",
-    ]
-    return any(re.search(pattern, normalized) for pattern in request_patterns)
+    normalized = _WHITESPACE_RE.sub(" ", text.strip().lower())
+    return _VOUCH_REQUEST_RE.search(normalized) is not None
 
 
-def is_vouch(text: str) -> bool:
+# Comprehensive vouch keywords (from prime directive)
+_VOUCH_KEYWORDS = [
+    # Positive vouches
+    'pos vouch', 'positive vouch', '+vouch', '+rep',
+    'vouch for', 'vouch', '+1', 'solid', 'legend', 'legit',
+    'good seller', 'good buyer', 'trusted', 'trustworthy',
+    'recommend', 'can vouch', 'i vouch', 'vouched', 'vouching',
+    'is vouched', 'are vouched',  # Affirmation patterns like "@user is vouched"
+
+    # Negative vouches
+    'neg vouch', 'negative vouch', '-vouch', '-rep',
+    'scammer', 'scam', 'do not recommend', 'vouch against',
+]
+
+# Composite regex: Match EITHER order
+# Pattern 1: keyword...@username OR Pattern 2: @username...keyword
+_VOUCH_KEYWORD_PATTERN = r'(' + '|'.join([re.escape(kw).replace(r'\ ', r'\s+') for kw in _VOUCH_KEYWORDS]) + r')'
+_VOUCH_RE = re.compile(r'(?:' + _VOUCH_KEYWORD_PATTERN + r'.*@\w+|@\w+.*' + _VOUCH_KEYWORD_PATTERN + r')')
+_VOUCH_KEYWORD_RE = re.compile(_VOUCH_KEYWORD_PATTERN)
+_HANDLE_START_RE = re.compile(r'@\w')
+
+
+def _vouch_single_line(text_lower: str) -> bool:
+    """
+    _VOUCH_RE for text without newlines, minus its `.*` backtracking: the
+    keyword has to end before the last @handle or start after the first.
+    """
+    first = _HANDLE_START_RE.search(text_lower)
+    if first is None:
+        return False
+    if _VOUCH_KEYWORD_RE.search(text_lower, first.start() + 2):
+        return True
+    last = text_lower.rfind('@')
+    while not _HANDLE_START_RE.match(text_lower, last):
+        last = text_lower.rfind('@', 0, last)
+    return _VOUCH_KEYWORD_RE.search(text_lower, 0, last) is not None
+
+
+def is_vouch(text: str, ctx: Optional["MessageCtx"] = None) -> bool:
     """
     Detect if message is a vouch (vouching for someone or affirming their vouch status)
     Uses composite pattern: vouch keyword + @username mention
@@ -223,33 +626,118 @@ def is_vouch(text: str) -> bool:
     
     Common patterns: "+rep @user", "vouch for @user", "neg vouch @scammer", "@user is vouched", etc.
     """
+    if ctx is not None:
+        return ctx.is_vouch
     if not text or len(text) < 5:  # Quick length check
         return False
     
-    text_lower = text.lower()
+    return _is_vouch_lower(text.lower())
+
+
+def _is_vouch_lower(text_lower: str) -> bool:
+    """is_vouch() for callers that already hold the lowercased text."""
+    if len(text_lower) < 5:
+        return False
+    if '@' not in text_lower:
+        return False
     if is_vouch_request(text_lower):
         return False
     
-    # Comprehensive vouch keywords (from prime directive)
-    vouch_keywords = [
-        # Positive vouches
-        'pos vouch', 'positive vouch', '+vouch', '+rep',
-        'vouch for', 'vouch', '+1', 'solid', 'legend', 'legit',
-        'good seller', 'good buyer', 'trusted', 'trustworthy',
-        'recommend', 'can vouch', 'i vouch', 'vouched', 'vouching',
-        'is vouched', 'are vouched',  # Affirmation patterns like "@user is vouched"
-        
-        # Negative vouches
-        'neg vouch', 'negative vouch', '-vouch', '-rep',
-        'scammer', 'scam', 'do not recommend', 'vouch against',
-    ]
-    
-    # Build composite regex pattern: Match EITHER order
-    # Pattern 1: keyword...@username OR Pattern 2: @username...keyword
-    keyword_pattern = r'(' + '|'.join([re.escape(kw).replace(r'\ ', r'\s+') for kw in vouch_keywords]) + r')'
-    composite_pattern = r'(?:' + keyword_pattern + r'.*@\w+|@\w+.*' + keyword_pattern + r')'
-    
-    return bool(re.search(composite_pattern, text_lower))
+    # `.` in _VOUCH_RE stops at newlines, so multi-line text keeps the full regex
+    if '\n' in text_lower:
+        return _VOUCH_RE.search(text_lower) is not None
+    return _vouch_single_line(text_lower)
+
+
+# Fallbacks for sanitize_text when the Aho-Corasick automaton is unavailable
+_BANNED_WORD_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(word) for word in BANNED_KEYWORDS_FLAT) + r')\b',
+    re.IGNORECASE
+)
+_LINK_BLOCKLIST_RE = re.compile(
+    '|'.join(re.escape(link) for link in sorted({*SCAM_DOMAINS, *URL_SHORTENERS}, key=len, reverse=True)),
+    re.IGNORECASE
+)
+# Both of the above as one case-sensitive scan of the lowered text. Without
+# IGNORECASE, sre can prefilter on first characters (~4x faster per message)
+_BLOCKLIST_LOWER_RE = re.compile(
+    r'(?P<word>\b(?:' + '|'.join(re.escape(word.lower()) for word in BANNED_KEYWORDS_FLAT) + r')\b)'
+    r'|(?P<link>' + '|'.join(
+        re.escape(link.lower()) for link in sorted({*SCAM_DOMAINS, *URL_SHORTENERS}, key=len, reverse=True)
+    ) + ')'
+)
+
+_REMOVED_RUN_RE = re.compile(r'(\[REMOVED\]\s*)+')
+_FILLER_CHOICES = ("premium goods", "safe product", "clean service", "trusted item", "solid drop")
+_URL_RE = re.compile(r'https?://[^\s<>"\']+')
+_SHORTENER_RE = re.compile('|'.join(re.escape(s) for s in sorted(URL_SHORTENERS, key=len, reverse=True)))
+# Only "does any pattern match" matters, so one alternation does
+_SCAM_URL_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in SCAM_URL_PATTERNS))
+
+# Refined regex patterns for sanitization
+_SANITIZE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'\b(?:great|good|best|perfect|excellent)\s+(?:for|with|on)\s+(?:drugs|cocaine|heroin|meth|weed)\b(?!.*(?:educational|fictional|awareness))',
+    r'\b(?:uses|using|buys|buying|sells|selling)\s+(?:cocaine|heroin|meth|weed|fentanyl)\b',
+    r'\b(?:weapons|guns|firearms)\s+(?:for sale|available|in stock)\b',
+    r'\b(?:been|been\s+buying|been\s+selling)\s+(?:cocaine|heroin|meth|drugs|weed)\b',
+))
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _at_word_boundary(text: str, i: int) -> bool:
+    # Same rule as regex \b: word/non-word transition (text edges are non-word)
+    before = i > 0 and _is_word_char(text[i - 1])
+    after = i < len(text) and _is_word_char(text[i])
+    return before != after
+
+
+def _splice_blocklist(text: str, text_lower: str) -> str:
+    """
+    Replace banned keywords ([REMOVED], whole words only) and scam domains /
+    URL shorteners ([LINK REMOVED]) using one automaton scan of the text.
+    """
+    spans = []
+    for end_index, (category, pattern) in automaton.iter(text_lower):
+        end = end_index + 1
+        start = end - len(pattern)
+        if category == 'banned_keyword':
+            if not (_at_word_boundary(text, start) and _at_word_boundary(text, end)):
+                continue
+            spans.append((start, end, '[REMOVED]'))
+        else:
+            spans.append((start, end, '[LINK REMOVED]'))
+    if not spans:
+        return text
+
+    # Leftmost, then longest, non-overlapping matches
+    spans.sort(key=lambda span: (span[0], span[0] - span[1]))
+    parts = []
+    pos = 0
+    for start, end, replacement in spans:
+        if start < pos:
+            continue
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _splice_blocklist_re(text: str, text_lower: str) -> str:
+    """_splice_blocklist() for when the automaton is unavailable."""
+    parts = []
+    pos = 0
+    for match in _BLOCKLIST_LOWER_RE.finditer(text_lower):
+        parts.append(text[pos:match.start()])
+        parts.append('[REMOVED]' if match.lastgroup == 'word' else '[LINK REMOVED]')
+        pos = match.end()
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return ''.join(parts)
 
 
 def sanitize_text(text: str) -> str:
@@ -262,63 +750,59 @@ def sanitize_text(text: str) -> str:
     if not text:
         return text
     
-    sanitized = text
-    
-    # Single-pass batch replacement of all banned keywords with WORD BOUNDARIES
-    # This prevents false positives like "lean" matching in "clean"
-    banned_pattern = re.compile(
-        r'\b(' + '|'.join(re.escape(word) for word in BANNED_KEYWORDS_FLAT) + r')\b',
-        re.IGNORECASE
-    )
-    sanitized = banned_pattern.sub('[REMOVED]', sanitized)
-    
-    # Refined regex patterns for sanitization
-    drug_weapon_patterns = [
-        r'\b(?:great|good|best|perfect|excellent)\s+(?:for|with|on)\s+(?:drugs|cocaine|heroin|meth|weed)\b(?!.*(?:educational|fictional|awareness))',
-        r'\b(?:uses|using|buys|buying|sells|selling)\s+(?:cocaine|heroin|meth|weed|fentanyl)\b',
-        r'\b(?:weapons|guns|firearms)\s+(?:for sale|available|in stock)\b',
-        r'\b(?:been|been\s+buying|been\s+selling)\s+(?:cocaine|heroin|meth|drugs|weed)\b',
-    ]
-    
-    for pattern in drug_weapon_patterns:
-        try:
-            sanitized = re.sub(pattern, '[REMOVED]', sanitized, flags=re.IGNORECASE)
-        except re.error:
-            continue
-    
-    # Remove scam domains
-    for domain in SCAM_DOMAINS:
-        pattern = re.compile(re.escape(domain), re.IGNORECASE)
-        sanitized = pattern.sub('[LINK REMOVED]', sanitized)
+    # Swap generic placeholders with softer wording to keep context natural.
+    # Picked per call, so repeated texts still get varied fillers
+    # (split + one random.choices call instead of a regex callback per match)
+    parts = _sanitize_parts(text)
+    sanitized = parts[0]
+    if len(parts) > 1:
+        fillers = random.choices(_FILLER_CHOICES, k=len(parts) - 1)
+        sanitized += ''.join(f + p for f, p in zip(fillers, parts[1:]))
+    return _WHITESPACE_RE.sub(' ', sanitized).strip()
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _sanitize_parts(text: str) -> Tuple[str, ...]:
+    # The deterministic part of sanitize_text, cached: the text split around
+    # each [REMOVED] placeholder
+    # Banned keywords (with WORD BOUNDARIES, so "lean" doesn't match in
+    # "clean"), scam domains and URL shorteners in a single pass
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        # lower() shifted offsets (rare non-ASCII case)
+        sanitized = _BANNED_WORD_RE.sub('[REMOVED]', text)
+        sanitized = _LINK_BLOCKLIST_RE.sub('[LINK REMOVED]', sanitized)
+    elif automaton is not None:
+        sanitized = _splice_blocklist(text, text_lower)
+    else:
+        sanitized = _splice_blocklist_re(text, text_lower)
     
-    # Remove URL shorteners
-    for shortener in URL_SHORTENERS:
-        pattern = re.compile(re.escape(shortener), re.IGNORECASE)
-        sanitized = pattern.sub('[LINK REMOVED]', sanitized)
+    for pattern in _SANITIZE_PATTERNS:
+        sanitized = pattern.sub('[REMOVED]', sanitized)
     
     # Remove suspicious URLs but keep the structure
-    urls = extract_urls(sanitized)
-    for url in urls:
-        is_suspicious, _ = check_url_reputation(url)
-        if is_suspicious:
-            sanitized = sanitized.replace(url, '[LINK REMOVED]')
+    sanitized = _URL_RE.sub(_replace_suspicious_url, sanitized)
     
     # Clean up multiple spaces and [REMOVED] repetitions
-    sanitized = re.sub(r'(\[REMOVED\]\s*)+', '[REMOVED] ', sanitized)
-
-    # Swap generic placeholders with softer wording to keep context natural
-    filler_choices = ["premium goods", "safe product", "clean service", "trusted item", "solid drop"]
-    sanitized = re.sub(r'\[REMOVED\]', lambda _: random.choice(filler_choices), sanitized)
+    sanitized = _REMOVED_RUN_RE.sub('[REMOVED] ', sanitized)
     sanitized = sanitized.replace('[LINK REMOVED]', '[clean link]')
-    sanitized = re.sub(r'\s+', ' ', sanitized).strip()
-    
-    return sanitized
+    return tuple(sanitized.split('[REMOVED]'))
+
+
+def _replace_suspicious_url(match: re.Match) -> str:
+    url = match.group(0)
+    return '[LINK REMOVED]' if check_url_reputation(url)[0] else url
 
 
 def extract_urls(text: str) -> list:
     """Extract all URLs from text"""
-    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    return re.findall(url_pattern, text)
+    return list(_extract_urls(text))
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _extract_urls(text: str) -> Tuple[str, ...]:
+    # Shared by check_patterns and the link-rate tracker for the same text
+    return tuple(_URL_RE.findall(text))
 
 
 def check_url_reputation(url: str) -> Tuple[bool, str]:
@@ -326,19 +810,135 @@ def check_url_reputation(url: str) -> Tuple[bool, str]:
     url_lower = url.lower()
     
     # Check URL shorteners (often used in scams)
-    for shortener in URL_SHORTENERS:
-        if shortener in url_lower:
-            return True, f"Suspicious URL shortener: {shortener}"
+    match = _SHORTENER_RE.search(url_lower)
+    if match:
+        return True, f"Suspicious URL shortener: {match.group(0)}"
     
     # Check scam URL patterns
-    for pattern in SCAM_URL_PATTERNS:
-        if re.search(pattern, url_lower):
-            return True, "Scam URL pattern detected"
+    if _SCAM_URL_RE.search(url_lower):
+        return True, "Scam URL pattern detected"
     
     return False, ""
 
 
-def check_patterns(text: str, user_id: int = None) -> Tuple[bool, str, str]:
+_DRUG_TRANSACTION_PATTERNS = (
+    re.compile(r'\b(?:selling|buying|offering|dealing|supply|distribute)\s+(?:cocaine|heroin|meth|fentanyl|mdma|ecstasy|lsd|weed|cannabis|opioid)\b', re.IGNORECASE),
+    re.compile(r'\b(?:for|buying|selling)\s+(?:cocaine|heroin|meth|fentanyl|drugs|weed)\b', re.IGNORECASE),
+    re.compile(r'\b(?:buy|sell|trade|purchase|selling|offer)\s+(?:drugs|weed|cocaine|heroin|meth|pills|xanax|oxy|fentanyl|mdma|lsd)\b', re.IGNORECASE),
+    re.compile(r'\b(?:cocaine|heroin|meth|fentanyl|xanax|oxy|drugs)\s+(?:available|for sale|in stock|pm me|message me|hit me up)\b', re.IGNORECASE),
+)
+
+
+# (reason, severity) per SUSPICIOUS_PATTERNS category, most severe first
+_SUSPICIOUS_VERDICTS = {
+    "critical": ("CRITICAL: Child exploitation pattern detected", "critical"),
+    "illegal": ("Illegal goods/services detected", "high"),
+    "fraud": ("Hacking/fraud activity detected", "high"),
+    "generic": ("Suspicious pattern detected (TOS violation)", "medium"),
+}
+
+
+def _suspicious_category(pattern: str) -> str:
+    """Category (a _SUSPICIOUS_VERDICTS key) of a SUSPICIOUS_PATTERNS entry."""
+    if any(term in pattern for term in ['child', 'cp', 'underage', 'minor']):
+        return "critical"
+    elif any(term in pattern for term in ['drug', 'weapon', 'explosive', 'counterfeit']):
+        return "illegal"
+    elif any(term in pattern for term in ['hack', 'steal', 'phish', 'fraud']):
+        return "fraud"
+    return "generic"
+
+
+_SUSPICIOUS_CATEGORIES = tuple(_suspicious_category(pattern) for pattern in SUSPICIOUS_PATTERNS)
+
+# Searched one by one in list order: the first pattern that matches decides
+# the verdict. A single alternation would let the leftmost match in the text
+# decide instead.
+_SUSPICIOUS_RULES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in SUSPICIOUS_PATTERNS)
+# The patterns are all lowercase, so on lowered text a case-sensitive search
+# gives the same matches, and sre can use its first-character prefilter
+# (~4x faster than IGNORECASE on a typical message)
+_SUSPICIOUS_LOWER_RULES = (
+    tuple(re.compile(pattern) for pattern in SUSPICIOUS_PATTERNS)
+    if all(p == p.lower() for p in SUSPICIOUS_PATTERNS)
+    else None
+)
+
+# Optional: scan all SUSPICIOUS_PATTERNS at once with Hyperscan (multi-pattern
+# DFA) instead of one regex search per pattern. Falls back to the regexes if
+# the package is missing or can't compile a pattern.
+try:
+    if importlib.util.find_spec("hyperscan") is None:
+        raise ImportError
+    hyperscan = importlib.import_module("hyperscan")
+    _suspicious_db = hyperscan.Database()
+    _suspicious_db.compile(
+        expressions=[pattern.encode() for pattern in SUSPICIOUS_PATTERNS],
+        ids=list(range(len(SUSPICIOUS_PATTERNS))),
+        elements=len(SUSPICIOUS_PATTERNS),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8]
+        * len(SUSPICIOUS_PATTERNS),
+    )
+    logger.info(f"Hyperscan database compiled: {len(SUSPICIOUS_PATTERNS)} suspicious patterns")
+except ImportError:
+    _suspicious_db = None
+except Exception as e:
+    logger.warning(f"Hyperscan unavailable for suspicious patterns: {e} (using regex)")
+    _suspicious_db = None
+
+# Hyperscan scratch space is per thread; check_patterns runs on _cpu_pool
+_hs_local = threading.local()
+
+
+def _suspicious_match(text: str, text_lower: Optional[str] = None) -> Optional[str]:
+    """Category of the first SUSPICIOUS_PATTERNS entry (in list order) matching text, or None."""
+    if _suspicious_db is not None:
+        scratch = getattr(_hs_local, "scratch", None)
+        if scratch is None:
+            scratch = _hs_local.scratch = hyperscan.Scratch(_suspicious_db)
+        hits = []
+        _suspicious_db.scan(
+            text.encode(),
+            match_event_handler=lambda rule_id, *_: hits.append(rule_id),
+            scratch=scratch,
+        )
+        # Lowest id = first in list order
+        return _SUSPICIOUS_CATEGORIES[min(hits)] if hits else None
+    if _SUSPICIOUS_LOWER_RULES is not None and text_lower is not None and len(text_lower) == len(text):
+        rules, subject = _SUSPICIOUS_LOWER_RULES, text_lower
+    else:
+        rules, subject = _SUSPICIOUS_RULES, text
+    for i, pattern in enumerate(rules):
+        if pattern.search(subject):
+            return _SUSPICIOUS_CATEGORIES[i]
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class MessageCtx:
+    """
+    A message plus the derived forms the checks share, so each is computed
+    once per message instead of once per check.
+    """
+    text: str
+    lower: str
+    no_mentions_lower: str
+    urls: Tuple[str, ...]
+    is_vouch: bool
+
+    @classmethod
+    def of(cls, text: str) -> "MessageCtx":
+        lower = text.lower()
+        return cls(
+            text=text,
+            lower=lower,
+            no_mentions_lower=strip_mentions(lower),
+            urls=_extract_urls(text),
+            is_vouch=_is_vouch_lower(lower),
+        )
+
+
+def check_patterns(text: str, user_id: int = None, ctx: Optional[MessageCtx] = None) -> Tuple[bool, str, str]:
     """
     Advanced pattern-based violation detection
     Returns: (is_violation, reason, severity)
@@ -346,18 +946,20 @@ def check_patterns(text: str, user_id: int = None) -> Tuple[bool, str, str]:
     """
     if not text:
         return False, "", "low"
+    if ctx is None:
+        ctx = MessageCtx.of(text)
     
     # Check whitelist first (educational content)
-    if check_whitelist(text):
+    if check_whitelist(text, ctx):
         return False, "", "low"
     
-    text_lower = text.lower()
-    text_no_mentions = strip_mentions(text_lower)
+    text_lower = ctx.lower
+    text_no_mentions = ctx.no_mentions_lower
     
     # WHITELIST: Skip MOST regex pattern checks for detected vouches (but keep drug transaction patterns)
     # Vouches should avoid pattern false positives like "always 100" matching scam patterns
     # But drug dealing in vouches is still a violation that needs to be caught
-    if is_vouch(text):
+    if ctx.is_vouch:
         # Vouches: keyword check + drug transaction patterns only
         for keyword in BANNED_KEYWORDS_FLAT:
             if keyword.lower() in text_no_mentions and is_contextual_violation(text_no_mentions, keyword):
@@ -367,13 +969,7 @@ def check_patterns(text: str, user_id: int = None) -> Tuple[bool, str, str]:
                     return True, f"Prohibited content: {keyword}", "medium"
         
         # Check drug transaction patterns even for vouches (these are unambiguous violations)
-        drug_patterns = [
-            re.compile(r'\b(?:selling|buying|offering|dealing|supply|distribute)\s+(?:cocaine|heroin|meth|fentanyl|mdma|ecstasy|lsd|weed|cannabis|opioid)\b', re.IGNORECASE),
-            re.compile(r'\b(?:for|buying|selling)\s+(?:cocaine|heroin|meth|fentanyl|drugs|weed)\b', re.IGNORECASE),
-            re.compile(r'\b(?:buy|sell|trade|purchase|selling|offer)\s+(?:drugs|weed|cocaine|heroin|meth|pills|xanax|oxy|fentanyl|mdma|lsd)\b', re.IGNORECASE),
-            re.compile(r'\b(?:cocaine|heroin|meth|fentanyl|xanax|oxy|drugs)\s+(?:available|for sale|in stock|pm me|message me|hit me up)\b', re.IGNORECASE),
-        ]
-        for pattern in drug_patterns:
+        for pattern in _DRUG_TRANSACTION_PATTERNS:
             if pattern.search(text):
                 return True, "Drug transaction in vouch", "high"
         
@@ -381,10 +977,8 @@ def check_patterns(text: str, user_id: int = None) -> Tuple[bool, str, str]:
         return False, "", "low"
     
     # NON-VOUCH MESSAGES: Full pattern checking (continue with existing logic)
-    critical_keywords = ['cp link', 'child porn', 'underage nudes', 'preteen', 'kiddie porn']
-    for keyword in critical_keywords:
-        if keyword in text_lower:
-            return True, "CRITICAL: Child exploitation material (zero tolerance)", "critical"
+    if _has_context(text_lower, "critical"):
+        return True, "CRITICAL: Child exploitation material (zero tolerance)", "critical"
     
     # Method 1: Aho-Corasick (fastest)
     if automaton:
@@ -418,29 +1012,36 @@ def check_patterns(text: str, user_id: int = None) -> Tuple[bool, str, str]:
                     return True, f"Prohibited content: {keyword}", "medium"
     
     # Check URL reputation
-    urls = extract_urls(text)
-    for url in urls:
+    for url in ctx.urls:
         is_suspicious, reason = check_url_reputation(url)
         if is_suspicious:
             return True, reason, "medium"
     
     # Check regex patterns
-    for pattern in SUSPICIOUS_PATTERNS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            # Determine severity based on pattern type
-            if any(term in pattern for term in ['child', 'cp', 'underage', 'minor']):
-                return True, "CRITICAL: Child exploitation pattern detected", "critical"
-            elif any(term in pattern for term in ['drug', 'weapon', 'explosive', 'counterfeit']):
-                return True, "Illegal goods/services detected", "high"
-            elif any(term in pattern for term in ['hack', 'steal', 'phish', 'fraud']):
-                return True, "Hacking/fraud activity detected", "high"
-            else:
-                return True, "Suspicious pattern detected (TOS violation)", "medium"
+    category = _suspicious_match(text, text_lower)
+    if category is not None:
+        reason, severity = _SUSPICIOUS_VERDICTS[category]
+        return True, reason, severity
     
     return False, "", "low"
 
 
+# Checked against the matched keyword itself, not the message
+_ALWAYS_VIOLATE = (
+    'cp link', 'child porn', 'underage nudes', 'preteen', 'kiddie porn',
+    'cocaine for sale', 'heroin for sale', 'meth for sale',
+    'guns for sale', 'weapons for sale', 'fake passport',
+    'buy cocaine', 'buy heroin', 'buy meth', 'sell cocaine',
+    'selling cocaine', 'selling heroin', 'selling meth',
+)
+_DRUG_KEYWORDS = ('cocaine', 'heroin', 'meth', 'weed', 'marijuana', 'fentanyl', 'oxy', 'xanax', 'mdma', 'lsd')
+_SUICIDE_KEYWORDS = ('kys', 'kill yourself', 'go kill yourself', 'you should die')
+# Keywords are short, so one regex search beats an any() loop over the terms
+_ALWAYS_VIOLATE_RE = re.compile('|'.join(map(re.escape, _ALWAYS_VIOLATE)))
+_DRUG_RE = re.compile('|'.join(map(re.escape, _DRUG_KEYWORDS)))
+_SUICIDE_RE = re.compile('|'.join(map(re.escape, _SUICIDE_KEYWORDS)))
+
+
 def is_contextual_violation(text_lower: str, keyword: str) -> bool:
     """
     Check if a keyword match is actually a violation in context.
@@ -452,97 +1053,38 @@ def is_contextual_violation(text_lower: str, keyword: str) -> bool:
     keyword_lower = keyword.lower()
     
     # Always flag these as violations regardless of context
-    always_violate = [
-        'cp link', 'child porn', 'underage nudes', 'preteen', 'kiddie porn',
-        'cocaine for sale', 'heroin for sale', 'meth for sale',
-        'guns for sale', 'weapons for sale', 'fake passport',
-        'buy cocaine', 'buy heroin', 'buy meth', 'sell cocaine',
-        'selling cocaine', 'selling heroin', 'selling meth',
-    ]
-    
-    if any(term in keyword_lower for term in always_violate):
+    if _ALWAYS_VIOLATE_RE.search(keyword_lower):
         return True
     
     # Drug keywords - HIGH CAUTION approach (few false negatives is better than many false positives)
-    drug_keywords = ['cocaine', 'heroin', 'meth', 'weed', 'marijuana', 'fentanyl', 'oxy', 'xanax', 'mdma', 'lsd']
-    if any(drug in keyword_lower for drug in drug_keywords):
+    if _DRUG_RE.search(keyword_lower):
         # ONLY allow if explicitly educational/safe context
-        safe_contexts = [
-            'drug test', 'drug prevention', 'drug awareness', 'drug education',
-            'drug addiction', 'drug rehabilitation', 'substance abuse',
-            'say no to drugs', 'drugs are bad', 'anti-drug',
-            'cocaine is bad', 'heroin kills', 'meth dangers',
-            'addiction recovery', 'rehab', 'recovery', 'treatment', 'counseling',
-        ]
-        if any(ctx in text_lower for ctx in safe_contexts):
-            return False
         # Otherwise, flag as violation (be conservative)
-        return True
+        return not _has_context(text_lower, "safe")
     
     # Special handling for suicide keywords - allow in gaming/movie contexts only
-    suicide_keywords = ['kys', 'kill yourself', 'go kill yourself', 'you should die']
-    if any(term in keyword_lower for term in suicide_keywords):
+    if _SUICIDE_RE.search(keyword_lower):
         # Allow if it's clearly in a gaming/movie/fictional context
-        gaming_context = [
-            'video game', 'game', 'fortnite', 'minecraft', 'roblox', 'gta', 'call of duty',
-            'movie', 'film', 'book', 'story', 'fiction', 'character',
-            'comedy', 'joke', 'satire', 'cartoon', 'anime', 'manga', 'novel',
-            'play', 'theater', 'tv show', 'series', 'npc', 'cinematic', 'script',
-        ]
-        if any(ctx in text_lower for ctx in gaming_context):
-            return False
-        # Otherwise, flag as violation
-        return True
-    
-    # Check for educational/fictional context that should be allowed
-    educational_contexts = [
-        'awareness', 'prevention', 'safety', 'education', 'campaign',
-        'documentary', 'movie', 'film', 'book', 'story', 'fiction',
-        'comedy', 'joke', 'satire', 'news', 'article', 'discussion',
-        'debate', 'analysis', 'study', 'research', 'training',
-        'course', 'class', 'lesson', 'tutorial', 'guide',
-    ]
+        return not _has_context(text_lower, "gaming")
     
     # If the text contains educational/fictional context, don't flag (for non-drug keywords)
-    if any(ctx in text_lower for ctx in educational_contexts):
+    if _has_context(text_lower, "educational"):
         return False
     
     # Check for negation/context that suggests it's not a violation
-    negation_words = [
-        'against', 'anti', 'stop', 'prevent', 'avoid', 'bad', 'wrong',
-        'illegal', 'dangerous', 'harmful', 'addiction', 'recovery',
-        'rehab', 'treatment', 'counseling', 'help', 'support',
-    ]
-    
-    if any(neg in text_lower for neg in negation_words):
+    if _has_context(text_lower, "negation"):
         return False
     
     # Default: flag as violation
     return True
 
 
-async def analyze_with_ai(text: str) -> Optional[Dict]:
-    """
-    Advanced AI semantic analysis using Groq API
-    Returns: {verdict: str, confidence: float, reason: str, severity: str} or None
-    """
-    if not GROQ_API_KEY or not ENABLE_AI_MODERATION:
-        return None
-    
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.1-8b-instant",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are an expert content moderator for Telegram groups. Your job is to detect content that violates Telegram's Terms of Service and could get the group banned.
+_GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+_GROQ_MODEL = "llama-3.1-8b-instant"
+# Markdown code fence the model sometimes wraps its JSON in
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\n?|\n?```$')
+
+_AI_MODERATION_PROMPT = """You are an expert content moderator for Telegram groups. Your job is to detect content that violates Telegram's Terms of Service and could get the group banned.
 
 CRITICAL VIOLATIONS (Severity: critical - ZERO TOLERANCE):
 - Child exploitation material (CSAM) of any kind
@@ -579,56 +1121,242 @@ Analyze the message and respond with JSON ONLY (no markdown):
 }
 
 Be strict but fair. Context matters. Educational content about dangers is SAFE."""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Analyze this message:\n\n{text}"
-                        }
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": 200
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Groq API error: {response.status_code}")
-                return None
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Parse JSON response
-            if content.startswith("```"):
-                content = re.sub(r'^```(?:json)?\n?', '', content)
-                content = re.sub(r'\n?```$', '', content)
-            
-            analysis = json.loads(content)
-            
-            # Validate response structure
-            required_fields = {"verdict", "confidence", "reason", "severity"}
-            if not required_fields.issubset(analysis.keys()):
-                logger.error(f"AI response missing fields: {required_fields - set(analysis.keys())}")
-                return None
-            
-            return analysis
-            
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse AI JSON response: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"AI analysis error: {e}")
-        return None
 
+_AI_BATCH_PROMPT = _AI_MODERATION_PROMPT + """
 
-async def rewrite_vouch_with_ai(original_text: str) -> Optional[str]:
+You will be given several numbered messages. Analyze each one independently and respond with JSON ONLY (no markdown):
+{"results": [<one object as above per message, in the same order>]}"""
+
+# Requests arriving within the window share one chat completion
+_AI_BATCH_WINDOW = 0.05  # seconds
+_AI_BATCH_MAX = 8
+
+_ai_pending: Dict[str, List[asyncio.Future]] = {}
+# text -> analysis; copy-pasted spam doesn't pay for another Groq call
+_ai_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_ai_flush_task: Optional[asyncio.Task] = None
+
+# Optional second tier behind _ai_cache: autoscaled instances share verdicts
+# through Redis, so spam copied across chats costs one Groq call in total
+_AI_SHARED_TTL = 3600  # seconds
+_redis_client = None
+
+_groq_client = None
+
+
+def _get_groq_client():
     """
-    Intelligently rewrite a vouch that violates ToS to be compliant.
-    Uses Groq AI to preserve vouch meaning while removing violations.
-    
-    Timeout handling: If AI takes too long (timeout), falls back to regex sanitization.
-    Retry logic: Attempts up to 2 times before giving up, with exponential backoff.
-    
-    Returns rewritten vouch text or None if rewrite fails/not needed
+    One pooled AsyncClient for every Groq call, so connections (and their
+    TLS sessions) are reused instead of handshaking per message.
+    """
+    global _groq_client
+    if _groq_client is None or _groq_client.is_closed:
+        # Imported on first use: only the AI paths need an HTTP client
+        import httpx
+
+        _groq_client = httpx.AsyncClient(
+            # HTTP/2 needs the optional h2 package
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _groq_client
+
+
+def _parse_ai_json(content: str):
+    content = content.strip()
+    if content.startswith("```"):
+        content = _JSON_FENCE_RE.sub('', content)
+    return json.loads(content)
+
+
+def _valid_analysis(analysis) -> bool:
+    """Validate response structure"""
+    required_fields = {"verdict", "confidence", "reason", "severity"}
+    keys = set(analysis) if isinstance(analysis, dict) else set()
+    if not required_fields.issubset(keys):
+        logger.error(f"AI response missing fields: {required_fields - keys}")
+        return False
+    return True
+
+
+async def analyze_with_ai(text: str) -> Optional[Dict]:
+    """
+    Advanced AI semantic analysis using Groq API
+    Returns: {verdict: str, confidence: float, reason: str, severity: str} or None
+
+    Concurrent calls are coalesced into one batched request.
+    """
+    if not GROQ_API_KEY or not ENABLE_AI_MODERATION:
+        return None
+
+    hit = _lru_get(_ai_cache, text)
+    if hit is not None:
+        return hit
+
+    global _ai_flush_task
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _ai_pending.setdefault(text, []).append(future)
+    if _ai_flush_task is None or _ai_flush_task.done():
+        _ai_flush_task = loop.create_task(_flush_ai())
+    return await future
+
+
+async def _flush_ai() -> None:
+    # Exits once nothing is pending; analyze_with_ai restarts it on demand
+    while _ai_pending:
+        if len(_ai_pending) < _AI_BATCH_MAX:
+            await asyncio.sleep(_AI_BATCH_WINDOW)
+        texts = list(_ai_pending)[:_AI_BATCH_MAX]
+        waiters = [_ai_pending.pop(text) for text in texts]
+        results: List[Optional[Dict]] = [None] * len(texts)
+        try:
+            results = await _resolve_ai_batch(texts)
+        except Exception as e:
+            logger.error(f"AI batch failed: {e}")
+        finally:
+            # Never leave a caller hanging: a failed batch means no verdict
+            _resolve_ai_waiters(texts, waiters, results)
+
+
+async def _resolve_ai_batch(texts: List[str]) -> List[Optional[Dict]]:
+    results = await _shared_ai_get(texts)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        fresh = await analyze_batch_with_ai([texts[i] for i in missing])
+        for i, result in zip(missing, fresh):
+            results[i] = result
+        # Failures aren't cached, so the next copy gets a fresh try
+        await _shared_ai_put({texts[i]: results[i] for i in missing if results[i] is not None})
+    return results
+
+
+def _resolve_ai_waiters(texts: List[str], waiters: List[List[asyncio.Future]], results: List[Optional[Dict]]) -> None:
+    for text, futures, result in zip(texts, waiters, results):
+        if result is not None:
+            _lru_put(_ai_cache, text, result)
+        for future in futures:
+            if not future.done():
+                future.set_result(result)
+
+
+def _get_redis_client():
+    """The shared Redis client, or None when REDIS_URL or the package is missing."""
+    global _redis_client
+    if _redis_client is None and REDIS_URL and importlib.util.find_spec("redis") is not None:
+        _redis_client = importlib.import_module("redis.asyncio").Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+def _shared_ai_key(text: str) -> str:
+    return "ai:" + hashlib.sha1(text.encode()).hexdigest()
+
+
+async def _shared_ai_get(texts: List[str]) -> List[Optional[Dict]]:
+    """Cached verdicts from Redis (one MGET), None for each miss."""
+    client = _get_redis_client()
+    if client is None:
+        return [None] * len(texts)
+    try:
+        raw = await client.mget([_shared_ai_key(text) for text in texts])
+    except Exception as e:
+        logger.warning(f"Shared AI cache read failed: {e}")
+        return [None] * len(texts)
+    return [_decode_shared_ai(value) for value in raw]
+
+
+def _decode_shared_ai(value) -> Optional[Dict]:
+    # Corrupt or foreign values are treated as misses
+    if not value:
+        return None
+    try:
+        analysis = json.loads(value)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable shared AI cache entry: {e}")
+        return None
+    return analysis if isinstance(analysis, dict) and _valid_analysis(analysis) else None
+
+
+async def _shared_ai_put(results: Dict[str, Dict]) -> None:
+    client = _get_redis_client()
+    if client is None or not results:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for text, result in results.items():
+                pipe.setex(_shared_ai_key(text), _AI_SHARED_TTL, json.dumps(result))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Shared AI cache write failed: {e}")
+
+
+async def analyze_batch_with_ai(texts: List[str]) -> List[Optional[Dict]]:
+    """
+    Analyze several messages with one Groq request.
+    Returns one analysis (or None on failure) per text, in order.
+    """
+    if len(texts) == 1:
+        system_prompt = _AI_MODERATION_PROMPT
+        user_content = f"Analyze this message:\n\n{texts[0]}"
+    else:
+        system_prompt = _AI_BATCH_PROMPT
+        user_content = "Analyze these messages:\n\n" + "\n\n".join(
+            f"[{i}] {text}" for i, text in enumerate(texts, 1)
+        )
+
+    try:
+        response = await _get_groq_client().post(
+            _GROQ_URL,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": _GROQ_MODEL,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                "temperature": 0.2,
+                "max_tokens": 200 * len(texts)
+            }
+        )
+
+        if response.status_code != 200:
+            logger.error(f"Groq API error: {response.status_code}")
+            return [None] * len(texts)
+
+        result = response.json()
+        parsed = _parse_ai_json(result["choices"][0]["message"]["content"])
+
+        if len(texts) == 1:
+            analyses = [parsed]
+        else:
+            analyses = parsed.get("results") if isinstance(parsed, dict) else None
+            if not isinstance(analyses, list) or len(analyses) != len(texts):
+                logger.error(f"AI batch response has wrong shape for {len(texts)} messages")
+                return [None] * len(texts)
+
+        return [a if _valid_analysis(a) else None for a in analyses]
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse AI JSON response: {e}")
+        return [None] * len(texts)
+    except Exception as e:
+        logger.error(f"AI analysis error: {e}")
+        return [None] * len(texts)
+
+
+async def rewrite_vouch_with_ai(original_text: str) -> Optional[str]:
+    """
+    Intelligently rewrite a vouch that violates ToS to be compliant.
+    Uses Groq AI to preserve vouch meaning while removing violations.
+    
+    Timeout handling: If AI takes too long (timeout), falls back to regex sanitization.
+    Retry logic: Attempts up to 2 times before giving up, with exponential backoff.
+    
+    Returns rewritten vouch text or None if rewrite fails/not needed
     Example:
       Input:  "vouch @user for selling lean"
       Output: "vouch @user for professional services"
@@ -646,19 +1374,18 @@ async def rewrite_vouch_with_ai(original_text: str) -> Optional[str]:
             # Timeout increases with each retry (3s, 5s)
             timeout_duration = 3.0 + (attempt * 2)
             
-            async with httpx.AsyncClient(timeout=timeout_duration) as client:
-                response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.1-8b-instant",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": """You are an expert at rewriting text to comply with Telegram ToS while preserving the core meaning.
+            response = await _get_groq_client().post(
+                _GROQ_URL,
+                headers={
+                    "Authorization": f"Bearer {GROQ_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": _GROQ_MODEL,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": """You are an expert at rewriting text to comply with Telegram ToS while preserving the core meaning.
 
 Your task: Rewrite the given vouch/message to remove TOS violations but keep the same intent and sentiment.
 
@@ -677,38 +1404,39 @@ Examples:
 - Input: "+rep @user sold me a gun" ÃƒÂ¢Ã¢Â€Â Ã¢Â€Â™ Output: "+rep @user reliable person"
 
 Remember: The rewrite should make the message SAFE for Telegram ToS while keeping the vouch intent."""
-                            },
-                            {
-                                "role": "user",
-                                "content": f"Rewrite this vouch to be Telegram ToS compliant:\n\n{original_text}"
-                            }
-                        ],
-                        "temperature": 0.5,
-                        "max_tokens": 150
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.warning(f"Groq vouch rewrite failed (status {response.status_code}, attempt {attempt + 1})")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(0.5)  # Brief backoff before retry
-                        continue
-                    return None
-                
-                result = response.json()
-                rewritten = result["choices"][0]["message"]["content"].strip()
-                
-                # Safety check: if AI didn't change it much, prefer regex sanitization
-                if rewritten.lower() == original_text.lower():
-                    return None
-                
-                # Verify rewritten text isn't still problematic
-                if len(rewritten) < 3 or len(rewritten) > 500:
-                    return None
-                
-                logger.info(f"AI vouch rewrite: '{original_text[:50]}...' ÃƒÂ¢Ã¢Â€Â Ã¢Â€Â™ '{rewritten[:50]}...'")
-                return rewritten
-                
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Rewrite this vouch to be Telegram ToS compliant:\n\n{original_text}"
+                        }
+                    ],
+                    "temperature": 0.5,
+                    "max_tokens": 150
+                },
+                timeout=timeout_duration
+            )
+            
+            if response.status_code != 200:
+                logger.warning(f"Groq vouch rewrite failed (status {response.status_code}, attempt {attempt + 1})")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(0.5)  # Brief backoff before retry
+                    continue
+                return None
+            
+            result = response.json()
+            rewritten = result["choices"][0]["message"]["content"].strip()
+            
+            # Safety check: if AI didn't change it much, prefer regex sanitization
+            if rewritten.lower() == original_text.lower():
+                return None
+            
+            # Verify rewritten text isn't still problematic
+            if len(rewritten) < 3 or len(rewritten) > 500:
+                return None
+            
+            logger.info(f"AI vouch rewrite: '{original_text[:50]}...' ÃƒÂ¢Ã¢Â€Â Ã¢Â€Â™ '{rewritten[:50]}...'")
+            return rewritten
+            
         except asyncio.TimeoutError:
             logger.warning(f"AI vouch rewrite timeout (attempt {attempt + 1}/{max_retries}, {timeout_duration}s)")
             if attempt < max_retries - 1:
@@ -726,225 +1454,51 @@ Remember: The rewrite should make the message SAFE for Telegram ToS while keepin
     return None  # All retries exhausted
 
 
-async def check_message(text: str, user_id: int = None) -> Tuple[bool, str, str, bool]:
-    """
-    Main moderation check - multi-layer detection
-    Returns: (should_remove, reason, severity, is_vouch)
-    
-    Detection Layers:
-    1. Vouch detection (determines if sanitization needed)
-    2. Pattern matching (instant, <10ms)
-    3. Toxicity detection via Toxic-BERT (50-100ms, free, local)
-    4. AI semantic analysis (2-3s, high accuracy)
-    5. Spam score calculation
-    """
-    # Check if this is a vouch first
-    message_is_vouch = is_vouch(text)
-    
-    # Layer 1: Fast pattern matching (always runs first)
-    is_violation, reason, severity = check_patterns(text, user_id)
-    if is_violation:
-        logger.info(f"Pattern violation [{severity}]: {reason}{' (VOUCH - will sanitize)' if message_is_vouch else ''}")
-        return True, reason, severity, message_is_vouch
-    
-    # Layer 2: Local toxicity detection (NEW - 50ms, free, catches harassment)
-    is_toxic, toxicity_reason = check_toxicity(text)
-    if is_toxic:
-        logger.info(f"Toxicity detected: {toxicity_reason}{' (VOUCH - will sanitize)' if message_is_vouch else ''}")
-        return True, toxicity_reason, "high", message_is_vouch
-    
-    # Layer 3: AI semantic analysis (optional, skip for vouches, only if enabled for others)
-    # Vouches use slang/slang like "fire" naturally - don't flag them with AI
-    if ENABLE_AI_MODERATION and GROQ_API_KEY and not message_is_vouch:
-        ai_result = await analyze_with_ai(text)
-        if ai_result:
-            # AI detected violation with high confidence
-            if ai_result.get("verdict") == "VIOLATION":
-                confidence = ai_result.get("confidence", 0)
-                ai_severity = ai_result.get("severity", "medium")
-                
-                # Critical violations: any confidence
-                if ai_severity == "critical":
-                    reason = f"AI CRITICAL: {ai_result.get('reason', 'Severe TOS violation')}"
-                    logger.warning(f"AI critical violation detected: {reason} (confidence: {confidence:.0%})")
-                    return True, reason, "critical", message_is_vouch
-                
-                # High severity: 70%+ confidence
-                elif ai_severity == "high" and confidence >= 0.70:
-                    reason = f"AI detected: {ai_result.get('reason', 'TOS violation')}"
-                    logger.info(f"AI high violation: {reason} (confidence: {confidence:.0%})")
-                    return True, reason, "high", message_is_vouch
-                
-                # Medium severity: 75%+ confidence
-                elif ai_severity == "medium" and confidence >= 0.75:
-                    reason = f"AI detected: {ai_result.get('reason', 'TOS violation')}"
-                    logger.info(f"AI medium violation: {reason} (confidence: {confidence:.0%})")
-                    return True, reason, "medium", message_is_vouch
-                
-                # Low severity: 80%+ confidence (to reduce false positives)
-                elif ai_severity == "low" and confidence >= 0.80:
-                    reason = f"AI detected: {ai_result.get('reason', 'Minor TOS violation')}"
-                    logger.info(f"AI low violation: {reason} (confidence: {confidence:.0%})")
-                    return True, reason, "low", message_is_vouch
-                
-                # Log potential violations with low confidence (for review)
-                elif confidence >= 0.60:
-                    logger.info(f"AI potential violation (low confidence {confidence:.0%}): {ai_result.get('reason')}")
-    
-    # Message is safe
-    return False, "", "low", message_is_vouch
-
-
-def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Optional[Dict[str, str]]:
+async def notify_user(user_id: int, message: str):
     """
-    Extract structured vouch information from a message.
-    
-    Enhanced with bulletproof polarity detection and robust mention extraction.
-    
-    Returns a dict with keys:
-      - from_username: str (prefers provided from_username, else empty)
-      - to_username: str (username with @ if available, else empty)
-      - polarity: 'pos' or 'neg'
-      - excerpt: short sanitized excerpt of original text (max 200 chars)
-
-    Returns None if no vouch-like content is found.
+    Notify the user with a direct message.
+    Placeholder function - integrate with your messaging system.
     """
-    if not text or len(text) < 5:
-        return None
-
-    txt = text.strip()
-    txt_lower = txt.lower()
-    if is_vouch_request(txt_lower):
-        return None
-
-    # Find all mentions like @username (is_vouch() already verified at least one exists)
-    mentions = re.findall(r'@[_a-zA-Z0-9-]+', txt)
-    
-    # If no mentions found, can't extract vouch info
-    if not mentions:
-        return None
-
-    # Enhanced polarity detection from prime directive
-    negative_keywords = [
-        'neg vouch', 'negative vouch', '-vouch', '-rep', 'scammer', 'scam',
-        'do not recommend', 'dont recommend', "don't recommend",
-        'not recommend', 'no vouch', 'never vouch', 'dont trust',
-        "don't trust", 'not legit', 'fraud', 'fake', 'unreliable', 'vouch against'
-    ]
-    positive_keywords = [
-        'pos vouch', 'positive vouch', '+vouch', '+rep', '+1',
-        'vouch', 'solid', 'legend', 'legit', 'trusted', 'trustworthy',
-        'recommend', 'good seller', 'good buyer', 'can vouch', 'reliable'
-    ]
-    
-    # Determine polarity: check negative first, default positive
-    polarity = 'neg' if any(neg_kw in txt_lower for neg_kw in negative_keywords) else 'pos'
-
-    # Choose target mention: prefer one that isn't the author
-    to_username = ''
-    if mentions:
-        if from_username:
-            from_norm = from_username.lstrip('@').lower()
-            # Find first mention that isn't the author
-            to_username = next((m for m in mentions if m.lstrip('@').lower() != from_norm), mentions[0])
-        else:
-            to_username = mentions[0]
-
-    # Build excerpt with light sanitization (handle URL boundaries better)
-    excerpt = re.sub(r'\s+', ' ', re.sub(r'https?://[^\s)]*', '[LINK]', txt)).strip()
-    if len(excerpt) > 200:
-        excerpt = excerpt[:197] + '...'
-
-    return {
-        'from_username': f"@{from_username.lstrip('@')}" if from_username else '',
-        'to_username': to_username,
-        'polarity': polarity,
-        'excerpt': excerpt,
-    }
+    logger.info(f"Notify user {user_id}: {message}")
+    # TODO: Implement user notification (e.g., via Telegram API)
+    pass
 
 
-def format_canonical_vouch(vouch_info: Dict[str, str]) -> str:
-    """Create the canonical simple vouch repost text."""
-    if not vouch_info:
-        return ""
+# Bounded pool for the CPU-bound layers (regex scans, Toxic-BERT) so a heavy
+# message doesn't stall the event loop for every other chat
+_cpu_pool = ThreadPoolExecutor(max_workers=_CPU_WORKERS, thread_name_prefix="modbot-cpu")
+_cpu_slots = asyncio.Semaphore(64)  # caps work queued on _cpu_pool
 
-    frm = vouch_info.get("from_username") or "[unknown]"
-    to = vouch_info.get("to_username") or "[unknown]"
-    excerpt = (vouch_info.get("excerpt") or "").strip()
-    polarity = vouch_info.get("polarity") or "pos"
-    title = "POS VOUCH" if polarity == "pos" else "NEG VOUCH"
-
-    lines = [
-        f"{title} {to}",
-        f"from: {frm}",
-    ]
 
-    note = _clean_note_excerpt(excerpt)
-    if note:
-        lines.append(note)
+async def _run_cpu(fn, *args):
+    async with _cpu_slots:
+        return await asyncio.get_running_loop().run_in_executor(_cpu_pool, fn, *args)
 
-    watchers = vouch_info.get("watchers") or []
-    if watchers:
-        lines.append(f"Last to vouch: {', '.join(watchers)}")
 
-    return "\n".join(lines)
+# text -> (ctx, check_patterns verdict); groups see the same "+1", "gm" and
+# copy-pasted spam over and over
+_pattern_cache: "OrderedDict[str, Tuple[MessageCtx, Tuple[bool, str, str]]]" = OrderedDict()
 
 
-def _clean_note_excerpt(excerpt: str) -> str:
-    if not excerpt:
-        return ""
-    cleaned = excerpt.strip()
-    cleaned = _VOUCH_PREFIX_PATTERN.sub("", cleaned).strip()
-    cleaned = re.sub(r"^@[\w\d_]+\s*", "", cleaned)
-    return cleaned.strip(" -:")
+def _ctx_and_patterns(text: str) -> Tuple[MessageCtx, Tuple[bool, str, str]]:
+    ctx = MessageCtx.of(text)
+    return ctx, check_patterns(text, ctx=ctx)
 
 
-def track_user_activity(user_id: int, text: str) -> Tuple[bool, str]:
-    """
-    Track user activity for rate limiting and spam detection
-    Returns: (is_violation, reason)
-    """
-    from datetime import datetime, timedelta
-    from config import MESSAGE_RATE_LIMIT, RATE_LIMIT_WINDOW, LINK_RATE_LIMIT, LINK_RATE_WINDOW
-    
-    now = datetime.now()
-    
-    # Clean old message history
-    message_tracker[user_id] = [
-        (ts, msg) for ts, msg in message_tracker[user_id]
-        if now - ts < timedelta(seconds=RATE_LIMIT_WINDOW)
-    ]
-    
-    # Clean old link history
-    link_tracker[user_id] = [
-        (ts, link) for ts, link in link_tracker[user_id]
-        if now - ts < timedelta(seconds=LINK_RATE_WINDOW)
-    ]
-    
-    # Check message rate
-    message_tracker[user_id].append((now, text))
-    if len(message_tracker[user_id]) > MESSAGE_RATE_LIMIT:
-        return True, f"Message flooding ({len(message_tracker[user_id])} messages in {RATE_LIMIT_WINDOW}s)"
-    
-    # Check link rate
-    urls = extract_urls(text)
-    for url in urls:
-        link_tracker[user_id].append((now, url))
-    
-    if len(link_tracker[user_id]) > LINK_RATE_LIMIT:
-        return True, f"Link spam ({len(link_tracker[user_id])} links in {LINK_RATE_WINDOW}s)"
-    
-    return False, ""
+# Messages shorter than this with no mention, digits, link or vouch wording
+# ("gm", "lol", "thanks") skip the CPU-pool hop and the AI layer
+_SHORT_TEXT_MAX = 10
 
 
-async def notify_user(user_id: int, message: str):
-    """
-    Notify the user with a direct message.
-    Placeholder function - integrate with your messaging system.
-    """
-    logger.info(f"Notify user {user_id}: {message}")
-    # TODO: Implement user notification (e.g., via Telegram API)
-    pass
+def _is_plain_short_text(text: str, text_lower: str) -> bool:
+    return (
+        len(text) < _SHORT_TEXT_MAX
+        and text.isascii()
+        and not text.isupper()
+        and not any(c in text for c in "@0123456789")
+        and "http" not in text_lower
+        and "vouch" not in text_lower
+    )
 
 
 async def check_message(text: str, user_id: int = None) -> Tuple[bool, str, str, bool]:
@@ -959,24 +1513,38 @@ async def check_message(text: str, user_id: int = None) -> Tuple[bool, str, str,
     4. AI semantic analysis (2-3s, high accuracy)
     5. Spam score calculation
     """
-    # Check if this is a vouch first
-    message_is_vouch = is_vouch(text)
-    
-    # Layer 1: Fast pattern matching (always runs first)
-    is_violation, reason, severity = check_patterns(text, user_id)
+    if not text:
+        return False, "", "low", False
+    plain_short = _is_plain_short_text(text, text.lower())
+
+    # Check if this is a vouch first, then Layer 1: fast pattern matching
+    # (repeats of a recent message reuse its verdict)
+    hit = _lru_get(_pattern_cache, text)
+    if hit is not None:
+        ctx, (is_violation, reason, severity) = hit
+    elif plain_short:
+        # The vouch and pattern checks are microseconds at this length,
+        # cheaper than handing them to the pool
+        ctx = MessageCtx.of(text)
+        is_violation, reason, severity = check_patterns(text, ctx=ctx)
+    else:
+        ctx, (is_violation, reason, severity) = await _run_cpu(_ctx_and_patterns, text)
+    if hit is None:
+        _lru_put(_pattern_cache, text, (ctx, (is_violation, reason, severity)))
+    message_is_vouch = ctx.is_vouch
     if is_violation:
         logger.info(f"Pattern violation [{severity}]: {reason}{' (VOUCH - will sanitize)' if message_is_vouch else ''}")
         return True, reason, severity, message_is_vouch
     
     # Layer 2: Local toxicity detection (NEW - 50ms, free, catches harassment)
-    is_toxic, toxicity_reason = check_toxicity(text)
+    is_toxic, toxicity_reason = await check_toxicity(text)
     if is_toxic:
         logger.info(f"Toxicity detected: {toxicity_reason}{' (VOUCH - will sanitize)' if message_is_vouch else ''}")
         return True, toxicity_reason, "high", message_is_vouch
     
     # Layer 3: AI semantic analysis (optional, skip for vouches, only if enabled for others)
     # Vouches use slang/slang like "fire" naturally - don't flag them with AI
-    if ENABLE_AI_MODERATION and GROQ_API_KEY and not message_is_vouch:
+    if ENABLE_AI_MODERATION and GROQ_API_KEY and not message_is_vouch and not plain_short:
         ai_result = await analyze_with_ai(text)
         if ai_result:
             # AI detected violation with high confidence
@@ -1021,7 +1589,15 @@ async def check_message(text: str, user_id: int = None) -> Tuple[bool, str, str,
     return False, "", "low", message_is_vouch
 
 
-def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Optional[Dict[str, str]]:
+def _excerpt_repl(match: re.Match) -> str:
+    return '[LINK]' if match.lastgroup == 'link' else ' '
+
+
+def extract_vouch_info(
+    text: str,
+    from_username: Optional[str] = None,
+    mentions: Optional[List[str]] = None,
+) -> Optional[Dict[str, str]]:
     """
     Extract structured vouch information from a message.
     
@@ -1033,8 +1609,22 @@ def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Option
       - polarity: 'pos' or 'neg'
       - excerpt: short sanitized excerpt of original text (max 200 chars)
 
+    Pass `mentions` (bare usernames, as from extract_mentions) to reuse an
+    existing scan instead of searching the text again.
+
     Returns None if no vouch-like content is found.
     """
+    info = _extract_vouch_info(text, from_username, tuple(mentions) if mentions is not None else None)
+    # Fresh dict per call: callers set fields (e.g. polarity) on the result
+    return dict(info) if info else None
+
+
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
+def _extract_vouch_info(
+    text: str,
+    from_username: Optional[str],
+    mentions: Optional[Tuple[str, ...]],
+) -> Optional[Dict[str, str]]:
     if not text or len(text) < 5:
         return None
 
@@ -1044,27 +1634,20 @@ def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Option
         return None
 
     # Find all mentions like @username (is_vouch() already verified at least one exists)
-    mentions = re.findall(r'@[_a-zA-Z0-9-]+', txt)
+    if mentions is None:
+        mentions = _VOUCH_MENTION_RE.findall(txt)
+    else:
+        mentions = ["@" + m for m in mentions]
     
     # If no mentions found, can't extract vouch info
     if not mentions:
         return None
 
-    # Enhanced polarity detection from prime directive
-    negative_keywords = [
-        'neg vouch', 'negative vouch', '-vouch', '-rep', 'scammer', 'scam',
-        'do not recommend', 'dont recommend', "don't recommend",
-        'not recommend', 'no vouch', 'never vouch', 'dont trust',
-        "don't trust", 'not legit', 'fraud', 'fake', 'unreliable', 'vouch against'
-    ]
-    positive_keywords = [
-        'pos vouch', 'positive vouch', '+vouch', '+rep', '+1',
-        'vouch', 'solid', 'legend', 'legit', 'trusted', 'trustworthy',
-        'recommend', 'good seller', 'good buyer', 'can vouch', 'reliable'
-    ]
-    
-    # Determine polarity: check negative first, default positive
-    polarity = 'neg' if any(neg_kw in txt_lower for neg_kw in negative_keywords) else 'pos'
+    # Determine polarity: negative markers win, default positive.
+    # Not fused with the vouch-request check into one scan: the phrases
+    # overlap ("no vouch?"), and a single non-overlapping pass would let a
+    # negative marker swallow a request. Both are cheap next to the cache.
+    polarity = 'neg' if _NEGATIVE_VOUCH_RE.search(txt_lower) else 'pos'
 
     # Choose target mention: prefer one that isn't the author
     to_username = ''
@@ -1077,7 +1660,7 @@ def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Option
             to_username = mentions[0]
 
     # Build excerpt with light sanitization (handle URL boundaries better)
-    excerpt = re.sub(r'\s+', ' ', re.sub(r'https?://[^\s)]*', '[LINK]', txt)).strip()
+    excerpt = _EXCERPT_RE.sub(_excerpt_repl, txt).strip()
     if len(excerpt) > 200:
         excerpt = excerpt[:197] + '...'
 
@@ -1089,15 +1672,20 @@ def extract_vouch_info(text: str, from_username: Optional[str] = None) -> Option
     }
 
 
-def format_canonical_vouch(vouch_info: Dict[str, str]) -> str:
-    """Create the canonical simple vouch repost text."""
+def format_canonical_vouch(vouch_info: Dict[str, str], **overrides) -> str:
+    """
+    Create the canonical simple vouch repost text.
+
+    Keyword overrides (e.g. to_username, watchers) take precedence over
+    vouch_info, so callers can reuse one vouch_info across targets.
+    """
     if not vouch_info:
         return ""
 
-    frm = vouch_info.get("from_username") or "[unknown]"
-    to = vouch_info.get("to_username") or "[unknown]"
-    excerpt = (vouch_info.get("excerpt") or "").strip()
-    polarity = vouch_info.get("polarity") or "pos"
+    frm = overrides.get("from_username") or vouch_info.get("from_username") or "[unknown]"
+    to = overrides.get("to_username") or vouch_info.get("to_username") or "[unknown]"
+    excerpt = (overrides.get("excerpt") or vouch_info.get("excerpt") or "").strip()
+    polarity = overrides.get("polarity") or vouch_info.get("polarity") or "pos"
     title = "POS VOUCH" if polarity == "pos" else "NEG VOUCH"
 
     lines = [
@@ -1109,19 +1697,25 @@ def format_canonical_vouch(vouch_info: Dict[str, str]) -> str:
     if note:
         lines.append(note)
 
-    watchers = vouch_info.get("watchers") or []
+    watchers = overrides.get("watchers") or vouch_info.get("watchers") or []
     if watchers:
         lines.append(f"Last to vouch: {', '.join(watchers)}")
 
     return "\n".join(lines)
 
 
+@lru_cache(maxsize=_TEXT_CACHE_SIZE)
 def _clean_note_excerpt(excerpt: str) -> str:
+    # Cached: multi-target vouches clean the same shared excerpt per target
     if not excerpt:
         return ""
     cleaned = excerpt.strip()
-    cleaned = _VOUCH_PREFIX_PATTERN.sub("", cleaned).strip()
-    cleaned = re.sub(r"^@[\w\d_]+\s*", "", cleaned)
+    m = _VOUCH_PREFIX_PATTERN.match(cleaned)
+    if m:
+        cleaned = cleaned[m.end():].strip()
+    m = _LEADING_MENTION_RE.match(cleaned)
+    if m:
+        cleaned = cleaned[m.end():]
     return cleaned.strip(" -:")
 
 
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modbot.services import cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_lookup_cache():
+    # Cached DB lookups would otherwise leak between tests that patch vouch_db
+    cache.clear()
+    yield
+    cache.clear()
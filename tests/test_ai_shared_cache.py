@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation
+
+
+def _analysis(text):
+    return {"verdict": "SAFE", "confidence": 0.9, "reason": text, "severity": "low"}
+
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def execute(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.fail_reads = False
+
+    async def mget(self, keys):
+        if self.fail_reads:
+            raise ConnectionError("redis down")
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def _setup(monkeypatch, redis=None):
+    calls = []
+
+    async def fake_batch(texts):
+        calls.append(list(texts))
+        return [_analysis(text) for text in texts]
+
+    monkeypatch.setattr(moderation, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(moderation, "ENABLE_AI_MODERATION", True)
+    monkeypatch.setattr(moderation, "_AI_BATCH_WINDOW", 0.001)
+    monkeypatch.setattr(moderation, "_redis_client", redis)
+    monkeypatch.setattr(moderation, "_ai_flush_task", None)
+    monkeypatch.setattr(moderation, "analyze_batch_with_ai", fake_batch)
+    moderation._ai_cache.clear()
+    return calls
+
+
+def test_shared_hit_skips_groq(monkeypatch):
+    redis = FakeRedis()
+    calls = _setup(monkeypatch, redis)
+    redis.store[moderation._shared_ai_key("buy followers")] = json.dumps(_analysis("from redis"))
+
+    result = run(moderation.analyze_with_ai("buy followers"))
+
+    assert result["reason"] == "from redis"
+    assert calls == []
+
+
+def test_fresh_verdicts_are_written_back(monkeypatch):
+    redis = FakeRedis()
+    calls = _setup(monkeypatch, redis)
+
+    run(moderation.analyze_with_ai("hello there"))
+
+    assert calls == [["hello there"]]
+    assert json.loads(redis.store[moderation._shared_ai_key("hello there")])["reason"] == "hello there"
+
+
+def test_corrupt_shared_value_is_a_miss(monkeypatch):
+    redis = FakeRedis()
+    calls = _setup(monkeypatch, redis)
+    redis.store[moderation._shared_ai_key("spam spam")] = b"\xff not json"
+    redis.store[moderation._shared_ai_key("other text")] = json.dumps(["not", "a", "dict"])
+
+    async def scenario():
+        return await asyncio.gather(
+            moderation.analyze_with_ai("spam spam"),
+            moderation.analyze_with_ai("other text"),
+        )
+
+    first, second = run(scenario())
+    assert first["reason"] == "spam spam"
+    assert second["reason"] == "other text"
+    assert calls == [["spam spam", "other text"]]
+
+
+def test_redis_outage_falls_back_to_groq(monkeypatch):
+    redis = FakeRedis()
+    redis.fail_reads = True
+    calls = _setup(monkeypatch, redis)
+
+    result = run(moderation.analyze_with_ai("need a verdict"))
+
+    assert result["reason"] == "need a verdict"
+    assert calls == [["need a verdict"]]
+
+
+def test_failed_batch_resolves_every_waiter(monkeypatch):
+    _setup(monkeypatch)
+
+    async def broken_batch(texts):
+        raise RuntimeError("unexpected payload")
+
+    monkeypatch.setattr(moderation, "analyze_batch_with_ai", broken_batch)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(moderation.analyze_with_ai("one"), moderation.analyze_with_ai("two")),
+            timeout=1,
+        )
+
+    assert run(scenario()) == [None, None]
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modbot.services import cleanup
+
+
+class FakeBot:
+    def __init__(self):
+        self.deleted = []
+
+    async def delete_message(self, chat_id, message_id):
+        self.deleted.append(message_id)
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def _reset(monkeypatch, job_registered=False):
+    monkeypatch.setattr(cleanup, "_pending_deletes", [])
+    monkeypatch.setattr(cleanup, "_sweeper_job_registered", job_registered)
+    monkeypatch.setattr(cleanup, "_sweeper_task", None)
+
+
+def test_sweep_deletes_only_due_messages_in_deadline_order(monkeypatch):
+    _reset(monkeypatch, job_registered=True)
+    bot = FakeBot()
+    cleanup.schedule_delete(bot, -100, 3, delay=0)
+    cleanup.schedule_delete(bot, -100, 2, delay=-1)
+    cleanup.schedule_delete(bot, -100, 9, delay=60)
+
+    run(cleanup.sweep_pending_deletes())
+
+    assert bot.deleted == [2, 3]
+    assert [entry[4] for entry in cleanup._pending_deletes] == [9]
+
+
+def test_full_heap_gives_up_on_the_soonest_message(monkeypatch):
+    _reset(monkeypatch, job_registered=True)
+    monkeypatch.setattr(cleanup, "_MAX_PENDING", 2)
+    bot = FakeBot()
+    cleanup.schedule_delete(bot, -100, 1, delay=10)
+    cleanup.schedule_delete(bot, -100, 2, delay=20)
+    cleanup.schedule_delete(bot, -100, 3, delay=30)
+
+    assert sorted(entry[4] for entry in cleanup._pending_deletes) == [2, 3]
+
+
+def test_background_sweeper_wakes_for_an_earlier_deadline(monkeypatch):
+    _reset(monkeypatch)
+    bot = FakeBot()
+
+    async def scenario():
+        cleanup.schedule_delete(bot, -100, 1, delay=0.2)
+        await asyncio.sleep(0.01)
+        # The sweeper is sleeping until 0.2s; this one must go out first
+        cleanup.schedule_delete(bot, -100, 2, delay=0.02)
+        await asyncio.wait_for(cleanup._sweeper_task, timeout=2)
+
+    run(scenario())
+    assert bot.deleted == [2, 1]
+    assert cleanup._pending_deletes == []
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modbot import dispatch
+from modbot.services import send_queue, vouches
+from modbot.services.metrics import Stat, _counters
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # Idle workers would otherwise linger for _WORKER_IDLE_TIMEOUT
+        for task in list(dispatch._chat_tasks.values()):
+            task.cancel()
+        dispatch._chat_tasks.clear()
+        dispatch._chat_queues.clear()
+        dispatch._overflow_tasks.clear()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+
+
+async def _drain(*chat_ids):
+    for chat_id in chat_ids:
+        queue = dispatch._chat_queues.get(chat_id)
+        if queue is not None:
+            await queue.join()
+
+
+def test_updates_for_one_chat_run_in_order():
+    seen = []
+
+    async def handler(n):
+        # Later updates finish first if they're allowed to overlap
+        await asyncio.sleep(0.01 * (3 - n))
+        seen.append(n)
+
+    async def scenario():
+        for n in range(3):
+            dispatch.dispatch(-1001, handler, n)
+        await _drain(-1001)
+
+    run(scenario())
+    assert seen == [0, 1, 2]
+
+
+def test_chats_run_concurrently():
+    seen = []
+    release = None
+
+    async def slow(tag):
+        await release.wait()
+        seen.append(tag)
+
+    async def fast(tag):
+        seen.append(tag)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        dispatch.dispatch(-1002, slow, "slow")
+        dispatch.dispatch(-1003, fast, "fast")
+        await _drain(-1003)
+        release.set()
+        await _drain(-1002)
+
+    run(scenario())
+    assert seen == ["fast", "slow"]
+
+
+def test_full_queue_drops_the_oldest_update_to_its_overflow_handler(monkeypatch):
+    monkeypatch.setattr(dispatch, "_QUEUE_MAXSIZE", 2)
+    seen = []
+    overflowed = []
+
+    async def handler(n):
+        seen.append(n)
+
+    async def on_overflow(n):
+        overflowed.append(n)
+
+    async def scenario():
+        # No awaits in between, so the worker hasn't taken anything yet
+        for n in range(4):
+            dispatch.dispatch(-1004, handler, n, on_overflow=on_overflow)
+        await _drain(-1004)
+        await asyncio.sleep(0)
+
+    dropped_before = _counters[Stat.DROPPED_UPDATES]
+    run(scenario())
+    assert seen == [2, 3]
+    assert overflowed == [0, 1]
+    assert _counters[Stat.DROPPED_UPDATES] - dropped_before == 2
+
+
+def test_drain_finishes_queued_updates_then_abandons_the_rest():
+    seen = []
+    stuck = None
+
+    async def handler(n):
+        seen.append(n)
+
+    async def hangs():
+        await stuck.wait()
+
+    async def scenario():
+        nonlocal stuck
+        stuck = asyncio.Event()
+        for n in range(3):
+            dispatch.dispatch(-1006, handler, n)
+        dispatch.dispatch(-1007, hangs)
+        dispatch.dispatch(-1007, handler, "never")
+        await dispatch.drain(timeout=0.1)
+
+    run(scenario())
+    assert seen == [0, 1, 2]
+    assert dispatch._chat_tasks == {} and dispatch._chat_queues == {}
+
+
+def test_handler_errors_do_not_stop_the_worker():
+    seen = []
+
+    async def boom():
+        raise RuntimeError("handler failed")
+
+    async def ok():
+        seen.append("ok")
+
+    async def scenario():
+        dispatch.dispatch(-1005, boom)
+        dispatch.dispatch(-1005, ok)
+        await _drain(-1005)
+
+    run(scenario())
+    assert seen == ["ok"]
+
+
+def test_temp_ack_does_not_wait_for_the_send(monkeypatch):
+    sent = None
+
+    def fake_enqueue(chat, text, reply_to=None, delete_after=None):
+        nonlocal sent
+        sent = asyncio.get_running_loop().create_future()
+        return sent
+
+    monkeypatch.setattr(send_queue, "enqueue", fake_enqueue)
+
+    async def scenario():
+        # Returns while the queued send is still pending
+        await asyncio.wait_for(vouches._send_temp_ack(object(), "[OK] Thank you."), timeout=1)
+        assert not sent.done()
+        sent.set_exception(RuntimeError("flood wait"))
+        await asyncio.sleep(0)
+
+    run(scenario())
+    # The failure was consumed by the done-callback, not left unretrieved
+    assert sent.exception() is not None
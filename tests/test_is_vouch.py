@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation
+
+
+SAMPLES = [
+    "+rep @bob legit",
+    "@bob +rep",
+    "@bob legit seller, pos vouch",
+    "pos   vouch for @alice",
+    "vouch @alice",
+    "@ alice pos vouch",
+    "email me at x@ then +rep",
+    "+rep @",
+    "neg vouch @carol scammed me @dave",
+    "@carol @dave hello there",
+    "just chatting about nothing",
+    "+rep to everyone",
+    "hi @bob, pos vouch @carol and +rep",
+    "pos\nvouch @bob",
+    "@bob\n+rep",
+    "+rep\n@bob",
+    "thanks all\npos vouch @erin",
+]
+
+
+def test_single_line_fast_path_matches_composite_regex():
+    for text in SAMPLES:
+        lower = text.lower()
+        if "\n" in lower or "@" not in lower:
+            continue
+        expected = moderation._VOUCH_RE.search(lower) is not None
+        assert moderation._vouch_single_line(lower) == expected, text
+
+
+def test_is_vouch_matches_composite_regex():
+    for text in SAMPLES:
+        lower = text.lower()
+        expected = (
+            len(lower) >= 5
+            and not moderation.is_vouch_request(lower)
+            and moderation._VOUCH_RE.search(lower) is not None
+        )
+        assert moderation._is_vouch_lower(lower) == expected, text
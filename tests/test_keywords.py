@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vouch_db
+from modbot.handlers import commands
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def _admin_command(handler, chat_id, *args):
+    update = SimpleNamespace(
+        effective_user=SimpleNamespace(id=commands.ADMIN_ID),
+        effective_chat=SimpleNamespace(id=chat_id),
+        message=FakeMessage(),
+    )
+    run(handler(update, SimpleNamespace(args=list(args))))
+    return update.message.replies
+
+
+def _fresh_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(vouch_db, "DB_PATH", str(tmp_path / "keywords.db"))
+    vouch_db.init_db()
+    monkeypatch.setattr(commands, "dynamic_banned_words", set(commands.BANNED_WORDS))
+    monkeypatch.setattr(commands, "_keywords_sorted_cache", None)
+
+
+def test_keyword_added_in_dm_applies_everywhere(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+
+    _admin_command(commands.add_keyword, 12345, "rugpull")
+    listing = _admin_command(commands.list_keywords, -100777)[0]
+
+    assert "rugpull" in listing
+    assert "rugpull" in commands.dynamic_banned_words
+    # What the next process starts with
+    assert "rugpull" in commands._load_banned_words()
+
+
+def test_removing_a_builtin_keyword_survives_restart(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+    builtin = commands.BANNED_WORDS[0]
+
+    replies = _admin_command(commands.remove_keyword, -100777, builtin)
+
+    assert replies[0].startswith("✅")
+    assert builtin not in commands.dynamic_banned_words
+    assert builtin not in commands._load_banned_words()
+
+
+def test_unknown_keyword_is_not_persisted(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+
+    replies = _admin_command(commands.remove_keyword, -100777, "never-added")
+
+    assert replies[0].startswith("⚠️")
+    assert vouch_db.get_banned_keyword_overrides() == {}
+
+
+
+def test_failed_write_is_reported_and_leaves_the_set_alone(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+    monkeypatch.setattr(commands, "set_banned_keyword", lambda keyword, banned: False)
+    builtin = commands.BANNED_WORDS[0]
+
+    added = _admin_command(commands.add_keyword, -100777, "rugpull")
+    removed = _admin_command(commands.remove_keyword, -100777, builtin)
+
+    assert added[0].startswith("❌") and removed[0].startswith("❌")
+    assert "rugpull" not in commands.dynamic_banned_words
+    assert builtin in commands.dynamic_banned_words
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation
+
+
+def test_non_ascii_mentions_are_kept_whole():
+    assert moderation.extract_mentions("@José recommend, vouch @bob_1") == ["José", "bob_1"]
+    assert moderation.extract_first_mention("@Zoë legit seller") == "Zoë"
+
+
+def test_non_ascii_mention_is_stripped_from_note():
+    entry = moderation.format_canonical_vouch(
+        {"from_username": "@alice", "polarity": "pos", "excerpt": "@José recommend"},
+        to_username="@José",
+    )
+    assert entry.splitlines()[-1] == "recommend"
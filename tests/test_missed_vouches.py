@@ -69,7 +69,7 @@ def test_missed_vouches_stored(monkeypatch):
     # Prevent duplicate blocking and bypass moderation checks for the test
     from modbot.services import vouches
     import moderation_engine.engine as me
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
     monkeypatch.setattr(vouches, "_send_temp_ack", lambda *a, **k: None)
     # Force is_vouch to true so we always call vouches code
     monkeypatch.setattr(me, "is_vouch", lambda t: True)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation_engine.engine as engine
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def _message(text, user_id=4242):
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=user_id, is_bot=False, username="tester"),
+        text=text,
+        caption=None,
+        entities=[],
+        forward_from=None,
+        forward_from_chat=None,
+        web_page_preview=None,
+    )
+
+
+def test_blocked_messages_do_not_touch_behavior_trackers():
+    user_id = 4242
+    engine._velocity_tracker.pop(user_id, None)
+
+    result = run(engine.moderate(_message("selling cocaine tonight", user_id), admin_id=1))
+
+    assert result["action"] == "delete"
+    assert user_id not in engine._velocity_tracker
+    assert user_id not in engine._new_user_index
+
+
+def test_clean_messages_reach_layer_three():
+    user_id = 4343
+    engine._velocity_tracker.pop(user_id, None)
+
+    results = [run(engine.moderate(_message("hello everyone", user_id), admin_id=1)) for _ in range(3)]
+
+    assert [r["action"] for r in results] == ["allow", "allow", "mute"]
+
+
+def test_layer2_is_a_plain_function():
+    # Re-exported from moderation_engine; callers expect a tuple, not a coroutine
+    from moderation_engine import layer2_semantic_check
+
+    assert layer2_semantic_check("hi") == (False, "SKIP")
+    assert layer2_semantic_check("send $50 to my account for the deal") == (False, "GROQ_DISABLED")
+
+
+def _first_layer1_rule(text):
+    # Reference for both backends: first _LAYER1_RULES entry in list order
+    for expression, label in engine._LAYER1_RULES:
+        if engine.re.search(expression, text, engine.re.IGNORECASE):
+            return label
+    return None
+
+
+def test_layer1_reports_keywords_in_list_order():
+    # 'counterfeit' appears first in the text, 'stolen' first in BANNED_WORDS
+    assert engine.layer1_keyword_check("counterfeit money and stolen goods") == (True, "stolen")
+    assert engine.layer1_keyword_check("COUNTERFEIT bills") == (True, "counterfeit")
+
+
+def test_layer1_backends_agree_on_labels():
+    samples = [
+        "counterfeit money and stolen goods",
+        "Phishing kit, also Stolen cards",
+        "selling cocaine and counterfeit watches",
+        "how to get heroin",
+        "nothing to see here",
+    ]
+    for text in samples:
+        label = _first_layer1_rule(text)
+        assert engine.layer1_keyword_check(text) == ((True, label) if label else (False, None))
+        assert engine.layer1_keyword_check(text, text.lower()) == ((True, label) if label else (False, None))
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation
+from config import BANNED_KEYWORDS_FLAT
+
+
+def test_fillers_are_picked_per_call(monkeypatch):
+    picks = iter([["premium goods"], ["solid drop"]])
+    monkeypatch.setattr(moderation.random, "choices", lambda population, k: next(picks))
+    text = f"vouch @bob sold me {BANNED_KEYWORDS_FLAT[0]} fast"
+
+    first = moderation.sanitize_text(text)
+    second = moderation.sanitize_text(text)
+
+    assert first == "vouch @bob sold me premium goods fast"
+    assert second == "vouch @bob sold me solid drop fast"
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modbot.services import send_queue
+
+
+class FakeChat:
+    def __init__(self, id=-100555):
+        self.id = id
+        self.sent = []
+
+    async def send_message(self, text, reply_to_message_id=None, **kwargs):
+        self.sent.append((text, reply_to_message_id))
+        bot = object()
+        return SimpleNamespace(
+            message_id=len(self.sent) + 100,
+            chat_id=self.id,
+            text=text,
+            get_bot=lambda: bot,
+        )
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def _quiet_queue(monkeypatch):
+    deletes = []
+    monkeypatch.setattr(send_queue, "_DEBOUNCE", 0.01)
+    monkeypatch.setattr(send_queue, "schedule_delete", lambda bot, chat_id, message_id, delay: deletes.append(message_id))
+    monkeypatch.setattr(send_queue, "_global_bucket", send_queue._TokenBucket(rate=1000.0, capacity=1000.0))
+    monkeypatch.setattr(send_queue, "_chat_buckets", {})
+    return deletes
+
+
+def test_ephemeral_burst_is_joined_into_one_message(monkeypatch):
+    deletes = _quiet_queue(monkeypatch)
+    chat = FakeChat()
+
+    async def scenario():
+        first = send_queue.enqueue(chat, "ack one", reply_to=7, delete_after=10)
+        second = send_queue.enqueue(chat, "ack two", reply_to=7, delete_after=10)
+        return await asyncio.gather(first, second)
+
+    first, second = run(scenario())
+    assert chat.sent == [("ack one\n\nack two", 7)]
+    assert first is second
+    assert deletes == [first.message_id]
+
+
+def test_permanent_posts_are_never_joined(monkeypatch):
+    deletes = _quiet_queue(monkeypatch)
+    chat = FakeChat()
+
+    async def scenario():
+        first = send_queue.enqueue(chat, "vouch from alice")
+        second = send_queue.enqueue(chat, "vouch from bob")
+        return await asyncio.gather(first, second)
+
+    first, second = run(scenario())
+    assert [text for text, _ in chat.sent] == ["vouch from alice", "vouch from bob"]
+    assert first.message_id != second.message_id
+    assert deletes == []
+
+
+def test_different_reply_targets_are_sent_separately(monkeypatch):
+    _quiet_queue(monkeypatch)
+    chat = FakeChat()
+
+    async def scenario():
+        await asyncio.gather(
+            send_queue.enqueue(chat, "ack a", reply_to=1, delete_after=10),
+            send_queue.enqueue(chat, "ack b", reply_to=2, delete_after=10),
+        )
+
+    run(scenario())
+    assert chat.sent == [("ack a", 1), ("ack b", 2)]
+
+
+def test_coalesce_respects_the_length_limit(monkeypatch):
+    monkeypatch.setattr(send_queue, "_MAX_JOINED_CHARS", 10)
+    items = [send_queue._Pending(text, None, 5, None) for text in ("aaaa", "bbbb", "cccc")]
+    batches = send_queue._coalesce(items)
+    # "aaaa\n\nbbbb" is exactly 10 characters; a third text would overflow
+    assert [[item.text for item in batch] for batch in batches] == [["aaaa", "bbbb"], ["cccc"]]
+
+
+def test_token_bucket_waits_once_empty(monkeypatch):
+    clock = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(send_queue, "asyncio", SimpleNamespace(sleep=fake_sleep))
+    monkeypatch.setattr(send_queue, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    bucket = send_queue._TokenBucket(rate=2.0, capacity=2.0)
+
+    async def scenario():
+        for _ in range(3):
+            await bucket.acquire()
+
+    run(scenario())
+    assert sleeps == [0.5]
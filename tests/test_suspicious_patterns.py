@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import moderation
+from config import SUSPICIOUS_PATTERNS
+
+
+def _first_in_list_order(text):
+    # Reference: what the per-pattern loop (and Hyperscan's min(hits)) reports
+    for i, pattern in enumerate(SUSPICIOUS_PATTERNS):
+        if moderation.re.search(pattern, text, moderation.re.IGNORECASE):
+            return moderation._SUSPICIOUS_CATEGORIES[i]
+    return None
+
+
+def test_earlier_pattern_wins_over_leftmost_match():
+    # The generic "guaranteed profit" match comes first in the text, but the
+    # critical pattern comes first in SUSPICIOUS_PATTERNS
+    assert moderation.check_patterns("guaranteed profit daily and cp video here") == (
+        True, "CRITICAL: Child exploitation pattern detected", "critical"
+    )
+
+
+def test_later_severe_pattern_does_not_override_earlier_one():
+    assert moderation.check_patterns("selling meth @bob_1 weekly") == (
+        True, "Suspicious pattern detected (TOS violation)", "medium"
+    )
+
+
+def test_lowered_and_original_text_agree():
+    samples = [
+        "guaranteed profit daily and cp video here",
+        "Selling METH @bob_1 weekly",
+        "Hacked accounts for sale, DM me",
+        "hello there, how is everyone",
+    ]
+    for text in samples:
+        expected = _first_in_list_order(text)
+        assert moderation._suspicious_match(text) == expected
+        assert moderation._suspicious_match(text, text.lower()) == expected
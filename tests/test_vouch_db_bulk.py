@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vouch_db
+
+
+def _fresh_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(vouch_db, "DB_PATH", str(tmp_path / "bulk.db"))
+    vouch_db.init_db()
+
+
+def _row(to_username, from_user_id=501, polarity="pos", text=None, chat_id=-100900):
+    return dict(
+        from_user_id=from_user_id,
+        from_username="bulkuser",
+        from_display_name="Bulk",
+        to_user_id=None,
+        to_username=to_username,
+        to_display_name=None,
+        polarity=polarity,
+        original_text=text or f"vouch @{to_username}",
+        canonical_text=f"POS VOUCH @{to_username}",
+        chat_id=chat_id,
+        message_id=77,
+        is_sanitized=False,
+    )
+
+
+def test_bulk_duplicate_check_matches_targets_case_insensitively(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+    vouch_db.store_vouch(**_row("Alice"))
+    vouch_db.store_vouch(**_row("bob", polarity="neg"))
+    vouch_db.store_vouch(**_row("carol", from_user_id=999))
+
+    dups = vouch_db.check_vouch_duplicates_24h_bulk(501, ["ALICE", "bob", "carol", "dave", ""], "pos")
+
+    # bob was a neg vouch and carol came from someone else
+    assert dups == {"alice"}
+    assert vouch_db.check_vouch_duplicates_24h_bulk(501, [], "pos") == set()
+
+
+def test_bulk_store_skips_existing_and_in_batch_duplicates(monkeypatch, tmp_path):
+    _fresh_db(monkeypatch, tmp_path)
+    vouch_db.store_vouch(**_row("alice"))
+
+    stored = vouch_db.store_vouches_bulk([
+        _row("alice"),
+        _row("bob"),
+        _row("BOB", text="vouch @bob"),
+        _row("carol"),
+    ])
+
+    assert stored == [False, True, False, True]
+    conn = vouch_db.get_db_connection()
+    try:
+        targets = [r[0] for r in conn.execute("SELECT to_username_lower FROM vouches ORDER BY id")]
+    finally:
+        conn.close()
+    assert targets == ["alice", "bob", "carol"]
+    assert vouch_db.store_vouches_bulk([]) == []
@@ -59,8 +59,8 @@ def test_handle_clean_vouch_stores_original_message(monkeypatch):
 
     # Make duplicate check return False so it stores
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
-    monkeypatch.setattr(vouches, "store_vouch", fake_store_vouch)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
+    monkeypatch.setattr(vouches, "store_vouches_bulk", lambda rows: [fake_store_vouch(**r) for r in rows])
 
     run(vouches.handle_clean_vouch(msg, from_username="tester"))
 
@@ -85,8 +85,8 @@ def test_handle_clean_vouch_multiple_targets(monkeypatch):
         chat.sent.append(text)
 
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
-    monkeypatch.setattr(vouches, "store_vouch", fake_store_vouch)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
+    monkeypatch.setattr(vouches, "store_vouches_bulk", lambda rows: [fake_store_vouch(**r) for r in rows])
 
     run(vouches.handle_clean_vouch(msg, from_username="multi"))
 
@@ -107,7 +107,7 @@ def test_handle_clean_vouch_inserts_db_multiple_targets(monkeypatch):
         chat.sent.append(text)
 
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
 
     # Run the handler which uses the real `store_vouch`
     run(vouches.handle_clean_vouch(msg, from_username="dbtester"))
@@ -134,7 +134,7 @@ def test_search_returns_targets(monkeypatch):
         chat.sent.append(text)
 
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
 
     # Add vouch via handler
     run(vouches.handle_clean_vouch(msg, from_username="searcher"))
@@ -175,7 +175,7 @@ def test_handle_dirty_vouch_attempts(monkeypatch):
     # Patch moderation rewrite
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
     monkeypatch.setattr(vouches, "rewrite_vouch_with_ai", fake_rewrite)
-    monkeypatch.setattr(vouches, "store_vouch", fake_store_vouch)
+    monkeypatch.setattr(vouches, "store_vouches_bulk", lambda rows: [fake_store_vouch(**r) for r in rows])
     # No retry counter support in service layer — we simply delete and warn
     # monkeypatch.setattr(vouches, "clear_vouch_retry_attempts", fake_clear)
 
@@ -221,8 +221,8 @@ def test_handle_clean_vouch_text_mention_resolves_user_id(monkeypatch):
         chat.sent.append(text)
 
     monkeypatch.setattr(vouches, "_send_temp_ack", _fake_ack)
-    monkeypatch.setattr(vouches, "check_vouch_duplicate_24h", lambda *a, **k: False)
-    monkeypatch.setattr(vouches, "store_vouch", fake_store_vouch)
+    monkeypatch.setattr(vouches, "check_vouch_duplicates_24h_bulk", lambda *a, **k: set())
+    monkeypatch.setattr(vouches, "store_vouches_bulk", lambda rows: [fake_store_vouch(**r) for r in rows])
 
     run(vouches.handle_clean_vouch(msg, from_username="mentioner"))
 
@@ -3,10 +3,13 @@ Vouch Database Module
 Stores canonical vouches in SQLite for persistence and searchability.
 Handles cases where user accounts are deleted but vouches remain searchable.
 """
+import asyncio
 import sqlite3
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC
-from typing import List, Dict, Optional
+from functools import partial
+from typing import Any, Callable, List, Dict, Optional, Set
 import os
 
 logger = logging.getLogger(__name__)
@@ -15,14 +18,40 @@ DB_PATH = "vouches.db"
 # Number of seconds a user has to retry a vouch before their attempt counter resets
 VOUCH_RETRY_WINDOW_SECONDS = 5 * 60  # 5 minutes
 
+# Voucher label resolved server-side: @username, else display name, else user id.
+# Names are denormalized on each vouch row, so no per-row lookup is needed.
+_FROM_DISPLAY_SQL = (
+    "COALESCE('@' || NULLIF(from_username, ''), NULLIF(from_display_name, ''), "
+    "'User #' || from_user_id) AS display_name"
+)
+
+
+# Blocking DB calls from async code run here, off the event loop. Every call
+# opens its own connection, so no connection is shared between threads.
+_DB_EXEC = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vouch-db")
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await a blocking vouch_db function on the DB thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXEC, partial(fn, *args, **kwargs))
+
+
+_wal_enabled = False
+
 
 def get_db_connection():
     """Get a database connection with WAL mode and concurrent access optimizations."""
-    conn = sqlite3.connect(DB_PATH)
-    # Enable WAL mode for concurrent reads/writes
-    conn.execute("PRAGMA journal_mode=WAL")
+    global _wal_enabled
+    conn = sqlite3.connect(DB_PATH, timeout=5.0)  # wait up to 5s on a locked DB
+    if not _wal_enabled:
+        # journal_mode is stored in the database file, so once per process is enough
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled = True
+    # Per-connection settings. WAL + NORMAL syncs on checkpoint rather than on
+    # every commit, so a batched insert costs one group commit.
     conn.execute("PRAGMA synchronous=NORMAL")
-    conn.execute("PRAGMA timeout=5000")  # 5 second timeout for locked DB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
@@ -77,6 +106,46 @@ def check_vouch_duplicate_24h(
         return False  # On error, allow vouch (fail-open)
 
 
+def check_vouch_duplicates_24h_bulk(
+    from_user_id: int,
+    to_usernames: List[str],
+    polarity: str
+) -> Set[str]:
+    """
+    Bulk form of check_vouch_duplicate_24h for a message with several targets.
+
+    Returns:
+        Lowercased usernames this user already vouched for within 24h
+    """
+    targets = sorted({t.lower() for t in to_usernames if t})
+    if not targets:
+        return set()
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        placeholders = ",".join("?" * len(targets))
+        cursor.execute(f"""
+        SELECT DISTINCT to_username_lower FROM vouches
+        WHERE from_user_id = ?
+          AND polarity = ?
+          AND timestamp > (strftime('%s','now') - 86400)
+          AND to_username_lower IN ({placeholders})
+    """, (from_user_id, polarity, *targets))
+
+        result = {row[0] for row in cursor.fetchall()}
+        conn.close()
+
+        if result:
+            logger.debug(f"24h vouch duplicates detected: user={from_user_id}, targets={sorted(result)}, polarity={polarity}")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Failed to check vouch duplicates: {e}")
+        return set()  # On error, allow vouches (fail-open)
+
+
 def get_prior_vouchers_for_target(to_username: Optional[str], polarity: str = "pos", limit: int = 5) -> List[Dict]:
     try:
         conn = get_db_connection()
@@ -106,6 +175,54 @@ def get_prior_vouchers_for_target(to_username: Optional[str], polarity: str = "p
         return []
 
 
+def get_prior_vouchers_for_targets(
+    to_usernames: List[str],
+    polarity: str = "pos",
+    limit: int = 5
+) -> Dict[str, List[Dict]]:
+    """
+    Bulk form of get_prior_vouchers_for_target.
+
+    Returns:
+        Lowercased target -> its latest `limit` vouchers (newest first);
+        targets without vouches are absent
+    """
+    targets = sorted({t.lower() for t in to_usernames if t})
+    if not targets:
+        return {}
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        placeholders = ",".join("?" * len(targets))
+        cursor.execute(f"""
+            SELECT to_username_lower, from_username, from_display_name, timestamp FROM (
+                SELECT to_username_lower, from_username, from_display_name, timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY to_username_lower ORDER BY timestamp DESC) AS rn
+                FROM vouches
+                WHERE to_username_lower IN ({placeholders}) AND polarity = ?
+            )
+            WHERE rn <= ?
+            ORDER BY to_username_lower, timestamp DESC
+        """, (*targets, polarity, limit))
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        vouchers: Dict[str, List[Dict]] = {}
+        for row in rows:
+            vouchers.setdefault(row[0], []).append({
+                "from_username": row[1],
+                "from_display_name": row[2],
+                "timestamp": row[3],
+            })
+        return vouchers
+
+    except Exception as e:
+        logger.error(f"Failed to fetch prior vouchers: {e}")
+        return {}
+
+
 def track_vouch_retry_attempt(user_id: int, chat_id: int, target_username: str) -> int:
     """
     Track a failed vouch attempt (ToS violation). Returns the current attempt count.
@@ -311,6 +428,12 @@ def init_db():
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_to_user_id ON vouches(to_user_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_from_username_lower ON vouches(from_username_lower)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_to_username_lower ON vouches(to_username_lower)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_message ON vouches(chat_id, message_id)")
+        # Covers the 24h duplicate checks (single and bulk)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dup_24h "
+            "ON vouches(from_user_id, polarity, to_username_lower, timestamp)"
+        )
         
         # Create sync state table to track last scanned message per chat
         cursor.execute(
@@ -337,6 +460,15 @@ def init_db():
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_retry_user_chat ON vouch_retry_attempts(user_id, chat_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_retry_time ON vouch_retry_attempts(last_attempt_time)")
 
+        # Admin keyword overrides, global like the built-in list:
+        # banned=1 adds a keyword, banned=0 removes one (built-ins included)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS banned_keywords (
+                keyword TEXT PRIMARY KEY,
+                banned INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+
         conn.commit()
         conn.close()
         logger.info("Database initialized successfully")
@@ -435,14 +567,15 @@ def vouch_exists_by_message_id(chat_id: int, message_id: int) -> bool:
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        # Point lookup on idx_chat_message; stops at the first match
         cursor.execute(
-            "SELECT COUNT(*) FROM vouches WHERE chat_id = ? AND message_id = ?",
+            "SELECT 1 FROM vouches WHERE chat_id = ? AND message_id = ? LIMIT 1",
             (chat_id, message_id)
         )
-        count = cursor.fetchone()[0]
+        found = cursor.fetchone() is not None
         conn.close()
-        logger.debug(f"vouch_exists_by_message_id: chat_id={chat_id}, message_id={message_id}, count={count}")
-        return count > 0
+        logger.debug(f"vouch_exists_by_message_id: chat_id={chat_id}, message_id={message_id}, found={found}")
+        return found
     except Exception as e:
         logger.error(f"Failed to check if vouch exists: {e}")
         return False
@@ -549,6 +682,82 @@ def store_vouch(
         return False
 
 
+def store_vouches_bulk(rows: List[Dict]) -> List[bool]:
+    """
+    Store several vouches in one transaction.
+
+    Args:
+        rows: Dicts with the same keys as store_vouch's arguments
+
+    Returns:
+        One flag per row: True if stored, False if skipped as a duplicate
+        (the whole batch is False if the write fails)
+    """
+    if not rows:
+        return []
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+
+        results: List[bool] = []
+        params = []
+        seen = set()
+        created_at = datetime.now(UTC).isoformat()
+        timestamp_val = datetime.now(UTC).timestamp()
+        for row in rows:
+            chat_id = row["chat_id"]
+            from_user_id = row["from_user_id"]
+            original_text = row["original_text"]
+            to_username_lower = _normalize_for_index(row.get("to_username"))
+
+            # Same duplicate rule as store_vouch, also applied within the batch
+            key = (chat_id, from_user_id, original_text, to_username_lower)
+            cursor.execute("""
+                SELECT 1 FROM vouches
+                WHERE chat_id = ? AND from_user_id = ? AND original_text = ? AND to_username_lower IS ?
+                LIMIT 1
+            """, key)
+            if key in seen or cursor.fetchone():
+                logger.info(f"⊘ Duplicate vouch skipped: chat={chat_id}, user={from_user_id}, target={row.get('to_username')}, polarity={row['polarity']}")
+                results.append(False)
+                continue
+            seen.add(key)
+
+            params.append((
+                from_user_id, row.get("from_username"), row.get("from_display_name"),
+                _normalize_for_index(row.get("from_username")), _normalize_for_index(row.get("from_display_name")),
+                row.get("to_user_id"), row.get("to_username"), row.get("to_display_name"),
+                to_username_lower, _normalize_for_index(row.get("to_display_name")),
+                row["polarity"], original_text, row["canonical_text"],
+                chat_id, row.get("message_id"), int(row.get("is_sanitized", False)),
+                timestamp_val, created_at
+            ))
+            results.append(True)
+
+        cursor.executemany("""
+            INSERT INTO vouches (
+                from_user_id, from_username, from_display_name,
+                from_username_lower, from_display_name_lower,
+                to_user_id, to_username, to_display_name,
+                to_username_lower, to_display_name_lower,
+                polarity, original_text, canonical_text,
+                chat_id, message_id, is_sanitized,
+                timestamp, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, params)
+
+        conn.commit()
+        conn.close()
+
+        logger.info(f"✓ Stored {len(params)} vouch(es) in one batch ({len(rows) - len(params)} duplicate(s) skipped)")
+        return results
+
+    except Exception as e:
+        logger.error(f"Failed to store vouches: {e}")
+        return [False] * len(rows)
+
+
 def delete_vouch_by_message(message_id: int, chat_id: int, user_id: int, is_admin: bool = False) -> tuple[bool, str]:
     """
     Delete a vouch from the database if it was posted by the requesting user (or by admin).
@@ -761,8 +970,8 @@ def search_vouches(
         logger.info(f"Search vouches: query='{query}' -> clean_query='{clean_query}'")
         
         # Build SQL query - search all relevant columns using normalized lowercase columns
-        sql = """
-            SELECT * FROM vouches 
+        sql = f"""
+            SELECT *, {_FROM_DISPLAY_SQL} FROM vouches 
             WHERE (
                 from_username_lower LIKE ? 
                 OR to_username_lower LIKE ? 
@@ -809,7 +1018,8 @@ def search_vouches(
                 'chat_id': row['chat_id'],
                 'message_id': row['message_id'],
                 'created_at': row['created_at'],
-                'is_sanitized': bool(row['is_sanitized'])
+                'is_sanitized': bool(row['is_sanitized']),
+                'display_name': row['display_name'],
             })
         
         return vouches
@@ -906,7 +1116,7 @@ def get_top_vouchers(
         polarity: 'pos' for positive vouches, 'neg' for negatives, 'all' for both
     
     Returns:
-        List of dicts: [{'from_username': 'alice', 'from_user_id': 123, 'count': 5}, ...]
+        List of dicts: [{'from_username': 'alice', 'from_user_id': 123, 'display_name': '@alice', 'vouch_count': 5}, ...]
         Sorted by count descending (highest first)
     """
     try:
@@ -918,7 +1128,7 @@ def get_top_vouchers(
         cutoff_timestamp = datetime.now(UTC).timestamp() - (days * 86400)
         
         # Build parameterized query to prevent SQL injection
-        sql = "SELECT from_user_id, from_username, from_display_name, COUNT(*) as vouch_count FROM vouches WHERE timestamp > ?"
+        sql = f"SELECT from_user_id, from_username, from_display_name, {_FROM_DISPLAY_SQL}, COUNT(*) as vouch_count FROM vouches WHERE timestamp > ?"
         params = [cutoff_timestamp]
         
         if chat_id:
@@ -945,6 +1155,7 @@ def get_top_vouchers(
                 'from_user_id': row['from_user_id'],
                 'from_username': row['from_username'],
                 'from_display_name': row['from_display_name'],
+                'display_name': row['display_name'],
                 'vouch_count': row['vouch_count']
             })
         
@@ -1194,6 +1405,46 @@ def get_sync_stats(chat_id: int) -> Dict:
         }
 
 
+def set_banned_keyword(keyword: str, banned: bool) -> bool:
+    """
+    Persist an admin override for a banned keyword (global, all chats).
+    
+    Args:
+        keyword: The keyword as the admin typed it
+        banned: True for /add_keyword, False for /remove_keyword
+    
+    Returns:
+        True if saved, False on error
+    """
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO banned_keywords (keyword, banned) VALUES (?, ?)",
+            (keyword, int(banned))
+        )
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to save banned keyword: {e}")
+        return False
+
+
+def get_banned_keyword_overrides() -> Dict[str, bool]:
+    """Return keyword -> banned for every persisted admin override."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT keyword, banned FROM banned_keywords")
+        overrides = {keyword: bool(banned) for keyword, banned in cursor.fetchall()}
+        conn.close()
+        return overrides
+    except Exception as e:
+        logger.error(f"Failed to get banned keywords: {e}")
+        return {}
+
+
 def format_vouch_for_display(vouch: Dict) -> str:
     """
     Format a vouch dictionary for display in search results.